@@ -1,10 +1,14 @@
-from flask import Flask, jsonify, render_template_string, request
+import os
+import sys
+from flask import Flask, Response, jsonify, render_template_string, request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from command_channel import CommandBoard, notify_drone
 
 app = Flask(__name__)
 
 # These flags control the drone
-yellow_requested = False
-land_requested = False
+board = CommandBoard(("YELLOW", "LAND"))
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -31,43 +35,55 @@ HTML_TEMPLATE = """
 
 @app.route("/")
 def index():
-    yellow_status = "YELLOW request active" if yellow_requested else "Idle"
-    land_status = "LAND request active" if land_requested else "Idle"
+    yellow_status = "YELLOW request active" if board.is_active("YELLOW") else "Idle"
+    land_status = "LAND request active" if board.is_active("LAND") else "Idle"
     return render_template_string(HTML_TEMPLATE, yellow_status=yellow_status, land_status=land_status)
 
 @app.route("/yellow", methods=["POST"])
 def trigger_yellow():
-    global yellow_requested
-    yellow_requested = True
+    board.trigger("YELLOW")
+    notify_drone("YELLOW")
     return render_template_string(HTML_TEMPLATE, yellow_status="YELLOW request active", land_status="Idle")
 
 @app.route("/land", methods=["POST"])
 def trigger_land():
-    global land_requested
-    land_requested = True
+    board.trigger("LAND")
+    notify_drone("LAND")
     return render_template_string(HTML_TEMPLATE, yellow_status="Idle", land_status="LAND request active")
 
 @app.route("/yellow_status")
 def yellow_status():
-    global yellow_requested
-    return "YELLOW" if yellow_requested else "IDLE"
+    return "YELLOW" if board.is_active("YELLOW") else "IDLE"
 
 @app.route("/land_status")
 def land_status():
-    global land_requested
-    return "LAND" if land_requested else "IDLE"
+    return "LAND" if board.is_active("LAND") else "IDLE"
 
 @app.route("/reset_yellow", methods=["POST"])
 def reset_yellow():
-    global yellow_requested
-    yellow_requested = False
+    board.reset("YELLOW")
     return "OK"
 
 @app.route("/reset_land", methods=["POST"])
 def reset_land():
-    global land_requested
-    land_requested = False
+    board.reset("LAND")
     return "OK"
 
+@app.route("/consume/<command>", methods=["POST"])
+def consume(command):
+    command = command.upper()
+    if command not in ("YELLOW", "LAND"):
+        return jsonify(error=f"unknown command {command}"), 404
+    active, seq = board.consume(command)
+    return jsonify(command=command, active=active, seq=seq)
+
+@app.route("/events")
+def events():
+    # Server-sent events: one line per YELLOW/LAND press with its sequence number
+    last_id = request.headers.get("Last-Event-ID")
+    last_seq = int(last_id) if last_id and last_id.isdigit() else None
+    return Response(board.stream(last_seq), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
-    app.run(port=8000, debug=False, host="0.0.0.0")
+    app.run(port=8000, debug=False, host="0.0.0.0", threaded=True)
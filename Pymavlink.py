@@ -1,50 +1,68 @@
-from pymavlink import mavutil
-import time
+import asyncio
 import sys
+from pymavlink import mavutil
 
-# Connect to the autopilot on COM8 at 57600 baud
-master = mavutil.mavlink_connection('udp:127.0.0.1:14550')
+from mavlink_system import MavlinkSystem
 
-# Wait for the heartbeat message to confirm connection
-master.wait_heartbeat()
-print(f"Heartbeat from system {master.target_system} component {master.target_component}")
+mavlink = mavutil.mavlink
+
+# How long an accepted arm command has to show up as an armed heartbeat
+ARM_TIMEOUT_S = 5.0
+
+# Connect to the autopilot on COM8 at 57600 baud
+master = MavlinkSystem(address='udp:127.0.0.1:14550')
 
 # Function to change flight mode
-def change_mode(mode_name):
-    if mode_name not in master.mode_mapping():
+async def change_mode(mode_name):
+    mapping = master.master.mode_mapping()
+    if mode_name not in mapping:
         print(f"Unknown mode: {mode_name}")
-        print("Available modes:", list(master.mode_mapping().keys()))
+        print("Available modes:", list(mapping.keys()))
         sys.exit(1)
-    mode_id = master.mode_mapping()[mode_name]
-    # Send the command to change mode
-    master.mav.set_mode_send(
-        master.target_system,
-        mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
-        mode_id)
-    # Wait for ACK
-    while True:
-        ack = master.recv_match(type='COMMAND_ACK', blocking=True)
-        if ack and ack.command == mavutil.mavlink.MAV_CMD_DO_SET_MODE:
-            print(f"Mode change to {mode_name} result: {mavutil.mavlink.enums['MAV_RESULT'][ack.result].description}")
-            break
+    # Send the command and wait for its ACK; telemetry keeps flowing meanwhile
+    result = await master.set_mode(mode_name)
+    if result is None:
+        print(f"Mode change to {mode_name}: no ACK")
+    else:
+        print(f"Mode change to {mode_name} result: {mavlink.enums['MAV_RESULT'][result].description}")
+    return result
 
 # Function to arm the drone
-def arm_drone():
-    master.mav.command_long_send(
-        master.target_system,
-        master.target_component,
-        mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
-        0,
-        1, 0, 0, 0, 0, 0, 0)
+async def arm_drone():
     print("Arming motors...")
-    master.motors_armed_wait()
+    result = await master.command_long(mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+    if result != mavlink.MAV_RESULT_ACCEPTED:
+        print(f"Arming refused: {'no ACK' if result is None else mavlink.enums['MAV_RESULT'][result].description}")
+        return False
+    heartbeat = await master.wait_message(mavlink.MAVLINK_MSG_ID_HEARTBEAT,
+                                          lambda m: m.get_srcSystem() == master.target_system
+                                          and m.base_mode & mavlink.MAV_MODE_FLAG_SAFETY_ARMED,
+                                          timeout_s=ARM_TIMEOUT_S)
+    if heartbeat is None:
+        # Accepted but never armed, e.g. a pre-arm check failed after the ACK
+        print(f"Arming accepted but motors not armed after {ARM_TIMEOUT_S:.0f}s")
+        return False
     print("Motors armed!")
+    return True
+
+async def main():
+    await master.connect()
+
+    # Wait for the heartbeat message to confirm connection
+    async for state in master.core.connection_state():
+        if state.is_connected:
+            break
+    print(f"Heartbeat from system {master.target_system} component {master.target_component}")
+
+    # Change mode to STABILIZE
+    await change_mode('STABILIZE')
 
-# Change mode to STABILIZE
-change_mode('STABILIZE')
+    # Wait a bit before arming
+    await asyncio.sleep(2)
 
-# Wait a bit before arming
-time.sleep(2)
+    # Arm the drone (throttle on)
+    await arm_drone()
+    print(f"{master.messages} messages received and dispatched")
+    await master.close()
 
-# Arm the drone (throttle on)
-arm_drone()
+asyncio.run(main())
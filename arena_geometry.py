@@ -0,0 +1,399 @@
+# arena_geometry.py
+# Usage: python arena_geometry.py ["Arena CAD/arena v2a.iges"] [north east ...]
+#   Prints the arena loops and, for each north/east pair, the query results.
+
+import asyncio
+import math
+import os
+import sys
+import numpy as np
+
+from log_ingest import file_sha1
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IGES_PATH = os.path.join(ROOT, "Arena CAD", "arena v2a.iges")
+ARENA_JSON = os.path.join(ROOT, "Missions", "arena.json")
+CACHE_DIR = os.path.join(ROOT, ".arena_cache")
+CACHE_VERSION = 1
+
+# IGES global parameter 14 (units flag) -> metres
+IGES_UNITS_M = {1: 0.0254, 2: 0.001, 3: 1.0, 4: 0.3048, 5: 1609.344, 6: 1.0, 7: 1000.0,
+                8: 0.0254e-3, 9: 1e-6, 10: 0.01, 11: 1e-7}
+ARC_STEP_DEG = 10.0
+
+
+def _iges_sections(path):
+    sections = {}
+    with open(path, "r", encoding="ascii", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if len(line) < 73:
+                continue
+            sections.setdefault(line[72], []).append(line[:72])
+    return sections
+
+
+def _split_params(text, delim, end):
+    """Split an IGES parameter string, taking nH Hollerith strings verbatim."""
+    fields, start, i, n = [], 0, 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == "H" and text[start:i].strip().isdigit():
+            stop = i + 1 + int(text[start:i].strip())
+            fields.append(text[i + 1:stop])
+            if stop >= n or text[stop] == end:
+                return fields
+            i = start = stop + 1
+            continue
+        if c == delim or c == end:
+            fields.append(text[start:i].strip())
+            if c == end:
+                return fields
+            start = i + 1
+        i += 1
+    if text[start:].strip():
+        fields.append(text[start:].strip())
+    return fields
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _num(field, default=0.0):
+    return float(field.replace("D", "E")) if field else default
+
+
+def _arc_points(p):
+    zt, cx, cy, sx, sy, ex, ey = (_num(v) for v in p[:7])
+    r = math.hypot(sx - cx, sy - cy)
+    a0 = math.atan2(sy - cy, sx - cx)
+    a1 = math.atan2(ey - cy, ex - cx)
+    if a1 <= a0:
+        a1 += 2 * math.pi
+    steps = max(2, int(math.ceil(math.degrees(a1 - a0) / ARC_STEP_DEG)))
+    angles = np.linspace(a0, a1, steps + 1)
+    return np.column_stack([cx + r * np.cos(angles), cy + r * np.sin(angles)])
+
+
+def parse_iges(path):
+    """
+    Planar curves of an IGES file as a list of (N, 2) polylines in metres.
+    Reads lines (110), arcs (100), copious data / polylines (106) and
+    B-splines (126, as their control polygon); other entities are skipped.
+    """
+    sections = _iges_sections(path)
+    global_text = "".join(sections.get("G", []))
+    delim = global_text[2] if global_text[:2] == "1H" else ","
+    end = global_text[6] if global_text[4:6] == "1H" else ";"
+    globals_ = _split_params(global_text, delim, end)
+    try:
+        # Model space scale is model units per real unit
+        scale = IGES_UNITS_M.get(int(_num(globals_[13])), 1.0) / (_num(globals_[12], 1.0) or 1.0)
+    except (IndexError, ValueError):
+        scale = 1.0
+
+    directory = sections.get("D", [])
+    params = sections.get("P", [])
+    curves = []
+    for i in range(0, len(directory) - 1, 2):
+        entity = int(directory[i][0:8])
+        pointer = int(directory[i][8:16])
+        count = int(directory[i + 1][24:32] or 1)
+        form = int(directory[i + 1][32:40] or 0)
+        text = "".join(line[:64] for line in params[pointer - 1:pointer - 1 + count])
+        p = _split_params(text, delim, end)[1:]
+        if entity == 110:
+            x1, y1, _, x2, y2, _ = (_num(v) for v in p[:6])
+            curves.append(np.array([[x1, y1], [x2, y2]]))
+        elif entity == 100:
+            curves.append(_arc_points(p))
+        elif entity == 106 and form in (1, 2, 11, 12, 63):
+            ip, n = int(_num(p[0])), int(_num(p[1]))
+            if ip == 1:
+                xy = np.array([_num(v) for v in p[3:3 + 2 * n]]).reshape(n, 2)
+            else:
+                width = 3 if ip == 2 else 6
+                xy = np.array([_num(v) for v in p[2:2 + width * n]]).reshape(n, width)[:, :2]
+            if form == 63:
+                xy = np.vstack([xy, xy[:1]])
+            curves.append(xy)
+        elif entity == 126:
+            k, m = int(_num(p[0])), int(_num(p[1]))
+            n = k + 1
+            start = 6 + (n + m + 1) + n
+            xyz = np.array([_num(v) for v in p[start:start + 3 * n]]).reshape(n, 3)
+            curves.append(xyz[:, :2])
+    return [c * scale for c in curves]
+
+
+def chain_loops(curves, tol=1e-3):
+    """Join curves end to end into closed loops (open leftovers are closed with a straight edge)."""
+    pending = [np.asarray(c, dtype=float) for c in curves if len(c) >= 2]
+    loops = []
+    while pending:
+        loop = pending.pop(0)
+        extended = True
+        while extended and np.hypot(*(loop[-1] - loop[0])) > tol:
+            extended = False
+            for j, c in enumerate(pending):
+                if np.hypot(*(c[0] - loop[-1])) <= tol:
+                    loop = np.vstack([loop, c[1:]])
+                elif np.hypot(*(c[-1] - loop[-1])) <= tol:
+                    loop = np.vstack([loop, c[::-1][1:]])
+                else:
+                    continue
+                pending.pop(j)
+                extended = True
+                break
+        if np.hypot(*(loop[-1] - loop[0])) <= tol:
+            loop = loop[:-1]
+        if len(loop) >= 3:
+            loops.append(loop)
+    return loops
+
+
+def _area(loop):
+    x, y = loop.T
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _segment_distances(points, edges):
+    """(P, M) distances from every point to every edge."""
+    a, b = edges[:, :2], edges[:, 2:]
+    ab = b - a
+    length2 = np.maximum((ab * ab).sum(axis=1), 1e-18)
+    ap = points[:, None, :] - a[None, :, :]
+    t = np.clip((ap * ab[None]).sum(axis=2) / length2, 0.0, 1.0)
+    closest = a[None] + t[..., None] * ab[None]
+    return np.hypot(*(points[:, None, :] - closest).transpose(2, 0, 1))
+
+
+class ArenaGeometry:
+    """
+    Arena outline plus obstacle loops in arena metres (north, east), with
+    a uniform-grid index for per-sample queries.
+
+    For every grid cell the index keeps the few border edges that can be
+    nearest to any point in it, and for every grid row the edges crossing
+    that row, so contains() and distance_to_border() look at a handful of
+    edges instead of all of them.
+    """
+
+    def __init__(self, loops, cell_m=0.25):
+        # Largest loop is the outline, the rest are obstacles
+        loops = sorted((np.asarray(l, dtype=float) for l in loops), key=_area, reverse=True)
+        self.outline = loops[0]
+        self.obstacles = loops[1:]
+        self.loops = loops
+        edges = [np.hstack([l, np.roll(l, -1, axis=0)]) for l in loops]
+        self.edges = np.vstack(edges)
+        self._edge_list = [tuple(e) for e in self.edges.tolist()]
+
+        self.cell_m = cell_m
+        pts = np.vstack(loops)
+        self.origin = pts.min(axis=0) - cell_m
+        self.shape = tuple(np.ceil((pts.max(axis=0) + cell_m - self.origin) / cell_m).astype(int))
+        self._build_index()
+
+    def _build_index(self):
+        rows, cols = self.shape
+        cell = self.cell_m
+        n0, e0 = self.origin
+        centers = np.stack(np.meshgrid(n0 + (np.arange(rows) + 0.5) * cell,
+                                       e0 + (np.arange(cols) + 0.5) * cell, indexing="ij"), axis=-1).reshape(-1, 2)
+        dist = _segment_distances(centers, self.edges)
+        nearest = dist.min(axis=1)
+        # A point in the cell is within r of the centre, so only edges within
+        # nearest + 2r of the centre can be nearest to it
+        r = cell * math.sqrt(0.5)
+        candidates = dist <= (nearest + 2 * r)[:, None]
+        self._cell_edges = [np.flatnonzero(c).tolist() for c in candidates]
+
+        # Row bands (constant north) for the crossing test along east
+        lo = np.minimum(self.edges[:, 0], self.edges[:, 2])
+        hi = np.maximum(self.edges[:, 0], self.edges[:, 2])
+        band_lo = n0 + np.arange(rows) * cell
+        overlap = (lo[None, :] <= band_lo[:, None] + cell) & (hi[None, :] >= band_lo[:, None])
+        self._row_edges = [np.flatnonzero(o).tolist() for o in overlap]
+
+    def _cell(self, north, east):
+        i = int((north - self.origin[0]) // self.cell_m)
+        j = int((east - self.origin[1]) // self.cell_m)
+        if 0 <= i < self.shape[0] and 0 <= j < self.shape[1]:
+            return i, j
+        return None
+
+    def contains(self, north, east):
+        """True inside the outline and outside every obstacle (even-odd crossing test)."""
+        cell = self._cell(north, east)
+        if cell is None:
+            return False
+        inside = False
+        edges = self._edge_list
+        for k in self._row_edges[cell[0]]:
+            n1, e1, n2, e2 = edges[k]
+            if (n1 > north) != (n2 > north):
+                if east < e1 + (north - n1) * (e2 - e1) / (n2 - n1):
+                    inside = not inside
+        return inside
+
+    def distance_to_border(self, north, east):
+        """Distance in metres to the nearest outline or obstacle edge."""
+        cell = self._cell(north, east)
+        if cell is None:
+            return float(_segment_distances(np.array([[north, east]]), self.edges).min())
+        best = math.inf
+        edges = self._edge_list
+        for k in self._cell_edges[cell[0] * self.shape[1] + cell[1]]:
+            n1, e1, n2, e2 = edges[k]
+            dn, de = n2 - n1, e2 - e1
+            length2 = dn * dn + de * de
+            t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((north - n1) * dn + (east - e1) * de) / length2))
+            d = math.hypot(north - n1 - t * dn, east - e1 - t * de)
+            if d < best:
+                best = d
+        return best
+
+    def clearance(self, north, east):
+        """Signed distance to the border: positive inside the arena, negative outside."""
+        d = self.distance_to_border(north, east)
+        return d if self.contains(north, east) else -d
+
+    def distance_ahead(self, north, east, dn, de, slack_m=0.0):
+        """
+        Distance along direction (dn, de) to the first border edge, inf if
+        none. Edges are stretched by slack_m at both ends, so a lane flown
+        right on (or just outside) the boundary still sees the corner ahead.
+        """
+        norm = math.hypot(dn, de)
+        if norm == 0:
+            return math.inf
+        dn, de = dn / norm, de / norm
+        a = self.edges[:, :2] - (north, east)
+        s = self.edges[:, 2:] - self.edges[:, :2]
+        denom = dn * s[:, 1] - de * s[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (a[:, 0] * s[:, 1] - a[:, 1] * s[:, 0]) / denom
+            u = (a[:, 0] * de - a[:, 1] * dn) / denom
+        slack = slack_m / np.maximum(np.hypot(s[:, 0], s[:, 1]), 1e-12)
+        hit = (np.abs(denom) > 1e-12) & (t > 1e-9) & (u >= -slack) & (u <= 1 + slack)
+        return float(t[hit].min()) if hit.any() else math.inf
+
+
+def _load_iges_loops(path, cache_dir, use_cache):
+    sha1 = file_sha1(path)
+    cache_path = os.path.join(cache_dir, f"{sha1}.v{CACHE_VERSION}.npz")
+    if use_cache and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            # np.split of zero points still yields one empty loop
+            return np.split(cached["points"], cached["splits"]) if len(cached["points"]) else []
+    loops = [l for l in chain_loops(parse_iges(path)) if len(l)]
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        points = np.vstack(loops).astype(np.float32) if loops else np.empty((0, 2), np.float32)
+        splits = np.cumsum([len(l) for l in loops])[:-1]
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, points=points, splits=splits)
+        os.replace(tmp_path, cache_path)
+    return loops
+
+
+def load_arena_geometry(path=IGES_PATH, fallback=ARENA_JSON, cache_dir=CACHE_DIR, use_cache=True, cell_m=0.25):
+    """
+    Arena from the CAD file (CAD X -> east, Y -> north), cached as .npz
+    under the file's SHA-1. Falls back to the polygon in Missions/arena.json
+    when the IGES file holds no curves.
+    """
+    loops = _load_iges_loops(path, cache_dir, use_cache) if path and os.path.exists(path) else []
+    if loops:
+        # CAD (x, y) = (east, north)
+        return ArenaGeometry([l[:, ::-1] for l in loops], cell_m)
+    from coverage_planner import load_arena
+    print(f"[ARENA] No curves in {path}, using {fallback}")
+    return ArenaGeometry([load_arena(fallback)], cell_m)
+
+
+class BorderWatch:
+    """
+    Calls on_border() when the drone is about to reach the arena border:
+    on every position_velocity_ned sample the position and velocity are
+    rotated into the arena frame (start_point is where the first sample
+    was taken, in arena metres), and the watch fires once the border
+    straight ahead is closer than margin_m plus the braking distance. It
+    re-arms once the border ahead is clear again (e.g. after the turn).
+    With a coverage grid attached, every sample also stamps the footprint.
+    """
+
+    def __init__(self, hub, arena, frame, on_border, start_point=(0.0, 0.0), margin_m=0.3, decel_m_s2=0.5,
+                 coverage=None):
+        self.hub = hub
+        self.arena = arena
+        self.frame = frame
+        self.on_border = on_border
+        self.start_point = start_point
+        self.margin_m = margin_m
+        self.decel_m_s2 = decel_m_s2
+        self.coverage = coverage
+        self.position = None
+        self.origin_ned = None
+        self.triggers = 0
+        self._armed = True
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _to_arena(self, dn, de):
+        (fn, fe), = self.frame.from_ned_batch([[dn, de]])
+        return self.start_point[0] + fn, self.start_point[1] + fe
+
+    def check(self, pv):
+        p, v = pv.position, pv.velocity
+        if self.origin_ned is None:
+            self.origin_ned = (p.north_m, p.east_m)
+        north, east = self._to_arena(p.north_m - self.origin_ned[0], p.east_m - self.origin_ned[1])
+        self.position = (north, east)
+        if self.coverage is not None:
+            self.coverage.update(north, east)
+        vn, ve = self.frame.from_ned_batch([[v.north_m_s, v.east_m_s]])[0]
+        speed = math.hypot(vn, ve)
+        threshold = self.margin_m + speed * speed / (2 * self.decel_m_s2)
+        if speed <= 0.05:
+            return False
+        ahead = self.arena.distance_ahead(north, east, vn, ve, self.margin_m)
+        near = ahead < threshold
+        if near and self._armed:
+            self._armed = False
+            self.triggers += 1
+            print(f"[BORDER] Border ahead at N={north:.2f} E={east:.2f}")
+            self.on_border()
+        elif ahead > threshold + self.margin_m:
+            # Clear by a full margin, so braking towards the border does not re-arm
+            self._armed = True
+        return near
+
+    async def _run(self):
+        while True:
+            self.check(await self.hub.next("position_velocity_ned"))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    path = args.pop(0) if args and not _is_number(args[0]) else IGES_PATH
+    arena = load_arena_geometry(path)
+    print(f"[ARENA] Outline with {len(arena.outline)} vertices, {len(arena.obstacles)} obstacles, "
+          f"{len(arena.edges)} edges, grid {arena.shape[0]}x{arena.shape[1]} @ {arena.cell_m} m")
+    for k in range(0, len(args) - 1, 2):
+        n, e = float(args[k]), float(args[k + 1])
+        print(f"  N={n:.2f} E={e:.2f}: inside={arena.contains(n, e)} border={arena.distance_to_border(n, e):.3f} m")
@@ -0,0 +1,308 @@
+# command_channel.py
+
+import asyncio
+import socket
+import threading
+from collections import deque
+import aiohttp
+
+GUI_URL = "http://localhost:8000"
+PUSH_HOST = "127.0.0.1"
+PUSH_PORT = 8001
+COMMANDS = ("YELLOW", "LAND")
+
+_push_socket = None
+
+
+def notify_drone(command, host=PUSH_HOST, port=PUSH_PORT):
+    """
+    Fire-and-forget push of a YELLOW/LAND press to the drone process.
+    Used by the Flask control panel; never blocks and never raises.
+    """
+    global _push_socket
+    if _push_socket is None:
+        _push_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _push_socket.setblocking(False)
+    try:
+        _push_socket.sendto(command.encode(), (host, port))
+    except OSError as e:
+        print(f"[PUSH] Could not notify drone of {command}: {e}")
+
+
+class CommandBoard:
+    """
+    Thread-safe YELLOW/LAND flags for the Flask control panel.
+
+    Every trigger gets a sequence number and is kept in a short history so
+    /events can stream it to the drone. consume() reads and clears a flag
+    under one lock, so a press can never slip in between a status read and
+    a reset.
+    """
+
+    def __init__(self, commands=COMMANDS, history=64):
+        self._cond = threading.Condition()
+        self._active = {command: False for command in commands}
+        self._events = deque(maxlen=history)
+        self.seq = 0
+
+    def trigger(self, command):
+        with self._cond:
+            self._active[command] = True
+            self.seq += 1
+            self._events.append((self.seq, command))
+            self._cond.notify_all()
+            return self.seq
+
+    def is_active(self, command):
+        with self._cond:
+            return self._active[command]
+
+    def reset(self, command):
+        with self._cond:
+            self._active[command] = False
+
+    def consume(self, command):
+        """Atomically read and clear a flag. Returns (was_active, seq)."""
+        with self._cond:
+            was_active = self._active[command]
+            self._active[command] = False
+            return was_active, self.seq
+
+    def stream(self, last_seq=None, keepalive_s=15):
+        """
+        Generator of server-sent-event text. A fresh client first gets the
+        flags that are already active, then every new trigger as it happens.
+        """
+        with self._cond:
+            if last_seq is None:
+                pending = [(self.seq, c) for c, active in self._active.items() if active]
+                last_seq = self.seq
+            else:
+                pending = [(seq, c) for seq, c in self._events if seq > last_seq]
+        for seq, command in pending:
+            yield f"id: {seq}\nevent: {command}\ndata: {seq}\n\n"
+            last_seq = max(last_seq, seq)
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.seq > last_seq, keepalive_s)
+                pending = [(seq, c) for seq, c in self._events if seq > last_seq]
+            if not pending:
+                yield ": keepalive\n\n"
+                continue
+            for seq, command in pending:
+                yield f"id: {seq}\nevent: {command}\ndata: {seq}\n\n"
+                last_seq = seq
+
+
+class _PushProtocol(asyncio.DatagramProtocol):
+    def __init__(self, channel):
+        self.channel = channel
+
+    def datagram_received(self, data, addr):
+        command = data.decode(errors="ignore").strip().upper()
+        if command in COMMANDS:
+            self.channel._push(command)
+
+
+class CommandChannel:
+    """
+    Async client for the control panel flags.
+
+    Status reads go over one pooled keep-alive HTTP session so they never
+    block the event loop. Button presses pushed by notify_drone() or the
+    /events stream set the flag immediately, so wait() can wake the mission
+    loop in milliseconds instead of at the next poll. While the event
+    stream is connected, status checks are answered locally and only a
+    consume() of an actual event goes over HTTP.
+    """
+
+    def __init__(self, base_url=GUI_URL, push_host=PUSH_HOST, push_port=PUSH_PORT, timeout_s=0.5,
+                 stream=True):
+        self.base_url = base_url.rstrip("/")
+        self.push_host = push_host
+        self.push_port = push_port
+        self.timeout_s = timeout_s
+        self.stream = stream
+        self.last_seq = None
+        self._session = None
+        self._transport = None
+        self._stream_task = None
+        self._streaming = False
+        self._pushed = {command: False for command in COMMANDS}
+        self._local = {command: False for command in COMMANDS}
+        self._wakeup = asyncio.Event()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=2, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        if self.push_port is not None:
+            loop = asyncio.get_event_loop()
+            try:
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _PushProtocol(self), local_addr=(self.push_host, self.push_port)
+                )
+                print(f"[COMMAND] Listening for pushed commands on UDP {self.push_port}")
+            except OSError as e:
+                print(f"[COMMAND] Push listener unavailable ({e}), polling only")
+        if self.stream:
+            self._stream_task = asyncio.create_task(self._listen_events())
+
+    async def close(self):
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            await asyncio.gather(self._stream_task, return_exceptions=True)
+            self._stream_task = None
+            self._streaming = False
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _push(self, command):
+        print(f"[COMMAND] {command} pushed by control panel")
+        self._pushed[command] = True
+        self._wakeup.set()
+
+    def inject(self, command):
+        """Raise a command from inside the drone process (e.g. the border watch)."""
+        self._local[command] = True
+        self._wakeup.set()
+
+    async def _listen_events(self):
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=30)
+        while True:
+            headers = {} if self.last_seq is None else {"Last-Event-ID": str(self.last_seq)}
+            try:
+                async with self._session.get(f"{self.base_url}/events", headers=headers,
+                                             timeout=timeout) as response:
+                    if response.status != 200:
+                        raise aiohttp.ClientError(f"HTTP {response.status}")
+                    self._streaming = True
+                    print("[COMMAND] Event stream connected")
+                    event = None
+                    async for raw in response.content:
+                        line = raw.decode(errors="ignore").rstrip("\r\n")
+                        if line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("id:"):
+                            self.last_seq = int(line[3:].strip())
+                        elif not line and event:
+                            if event in COMMANDS:
+                                self._push(event)
+                            event = None
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"[COMMAND] Event stream lost ({e}), polling until reconnect")
+            self._streaming = False
+            await asyncio.sleep(1)
+
+    async def _get(self, path):
+        try:
+            async with self._session.get(f"{self.base_url}{path}") as response:
+                if response.status != 200:
+                    return None
+                return (await response.text()).strip()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[COMMAND] GET {path} failed: {e}")
+            return None
+
+    async def _post(self, path):
+        try:
+            async with self._session.post(f"{self.base_url}{path}") as response:
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[COMMAND] POST {path} failed: {e}")
+            return False
+
+    async def _post_json(self, path):
+        try:
+            async with self._session.post(f"{self.base_url}{path}") as response:
+                if response.status != 200:
+                    return None
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"[COMMAND] POST {path} failed: {e}")
+            return None
+
+    async def yellow_status(self):
+        if self._pushed["YELLOW"]:
+            return True
+        if self._streaming:
+            return False
+        return await self._get("/yellow_status") == "YELLOW"
+
+    async def land_status(self):
+        if self._pushed["LAND"]:
+            return True
+        if self._streaming:
+            return False
+        return await self._get("/land_status") == "LAND"
+
+    async def consume(self, command):
+        """
+        Read and clear a flag in one server-side step. Returns True if the
+        command was active. No HTTP round trip while the event stream is
+        connected and nothing has been pushed.
+        """
+        if self._local[command]:
+            # Never reached the control panel, nothing to clear there
+            self._local[command] = False
+            return True
+        pushed = self._pushed[command]
+        self._pushed[command] = False
+        if self._streaming and not pushed:
+            return False
+        result = await self._post_json(f"/consume/{command.lower()}")
+        if result is None:
+            return pushed
+        return result["active"]
+
+    async def consume_yellow(self):
+        return await self.consume("YELLOW")
+
+    async def consume_land(self):
+        return await self.consume("LAND")
+
+    async def reset_yellow(self):
+        self._pushed["YELLOW"] = False
+        return await self._post("/reset_yellow")
+
+    async def reset_land(self):
+        self._pushed["LAND"] = False
+        return await self._post("/reset_land")
+
+    async def next_command(self, poll_s=1.0):
+        """
+        Wait for the next LAND or YELLOW, consume it and return its name.
+        LAND wins if both are up. Pushed and injected commands return at
+        once; without the event stream the panel is polled every poll_s.
+        """
+        while True:
+            for command in ("LAND", "YELLOW"):
+                if await self.consume(command):
+                    return command
+            await self.wait(poll_s)
+
+    async def wait(self, timeout):
+        """
+        Sleep up to timeout seconds, returning early (True) as soon as a
+        command is pushed. Returns False if the timeout elapsed. Each push
+        wakes one wait(), so a pending flag does not turn loops into spins.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._wakeup.clear()
+        return True
@@ -0,0 +1,172 @@
+# coverage_grid.py
+
+import math
+import numpy as np
+
+# Set bits per byte value
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+BLOCK = 8
+
+
+def _inside_mask(arena, centers_n, centers_e):
+    """Vectorised even-odd test of a grid of cell centres against every arena edge."""
+    inside = np.zeros((len(centers_n), len(centers_e)), dtype=bool)
+    nn = centers_n[:, None]
+    for n1, e1, n2, e2 in arena.edges.tolist():
+        if n1 == n2:
+            continue
+        crosses = (n1 > nn) != (n2 > nn)
+        e_cross = e1 + (nn - n1) * (e2 - e1) / (n2 - n1)
+        inside ^= crosses & (centers_e[None, :] < e_cross)
+    return inside
+
+
+class CoverageGrid:
+    """
+    Bit-packed map of the arena cells the camera footprint has passed over.
+
+    One bit per cell_m cell, eight cells per byte along east. The footprint
+    is a disc of footprint_m diameter, pre-packed once for each of the eight
+    bit alignments, so an update is a few row-slice ORs. The covered count
+    and a per-block count of uncovered cells (BLOCK x BLOCK cells) are kept
+    up to date on every stamp, so percent() is O(1) and nearest_uncovered()
+    only searches inside the nearest blocks that still have gaps.
+    """
+
+    def __init__(self, arena, cell_m=0.1, footprint_m=1.5):
+        self.arena = arena
+        self.cell_m = cell_m
+        pts = np.vstack(arena.loops)
+        self.origin = pts.min(axis=0)
+        rows, cols = np.ceil((pts.max(axis=0) - self.origin) / cell_m).astype(int)
+        self.rows, self.cols = int(rows), int(cols)
+        self.nbytes = (self.cols + 7) // 8
+
+        centers_n = self.origin[0] + (np.arange(self.rows) + 0.5) * cell_m
+        centers_e = self.origin[1] + (np.arange(self.cols) + 0.5) * cell_m
+        inside = _inside_mask(arena, centers_n, centers_e)
+        self.inside = self._pack(inside)
+        self.inside_count = int(inside.sum())
+        self.bits = np.zeros_like(self.inside)
+        self.covered = 0
+
+        # Uncovered inside cells per block
+        padded = np.zeros((-(-self.rows // BLOCK) * BLOCK, -(-self.cols // BLOCK) * BLOCK), dtype=np.int32)
+        padded[:self.rows, :self.cols] = inside
+        self.block_open = padded.reshape(padded.shape[0] // BLOCK, BLOCK, -1, BLOCK).sum(axis=(1, 3))
+
+        radius = footprint_m / 2.0 / cell_m
+        k = int(math.ceil(radius))
+        yy, xx = np.mgrid[-k:k + 1, -k:k + 1]
+        disc = (yy * yy + xx * xx) <= radius * radius
+        self._stamp_k = k
+        self._stamps = []
+        for shift in range(8):
+            wide = np.zeros((disc.shape[0], disc.shape[1] + 8), dtype=bool)
+            wide[:, shift:shift + disc.shape[1]] = disc
+            self._stamps.append(np.packbits(wide, axis=1))
+
+    def _pack(self, mask):
+        wide = np.zeros((self.rows, self.nbytes * 8), dtype=bool)
+        wide[:, :self.cols] = mask
+        return np.packbits(wide, axis=1)
+
+    def cell_of(self, north, east):
+        return int((north - self.origin[0]) // self.cell_m), int((east - self.origin[1]) // self.cell_m)
+
+    def update(self, north, east):
+        """Stamp the footprint at (north, east) in arena metres; returns the newly covered cells."""
+        row, col = self.cell_of(north, east)
+        k = self._stamp_k
+        left = col - k
+        shift = left % 8
+        stamp = self._stamps[shift]
+        r0, b0 = row - k, left // 8
+        # Clip the stamp to the grid
+        sr0, sb0 = max(0, -r0), max(0, -b0)
+        r0, b0 = max(0, r0), max(0, b0)
+        r1 = min(self.rows, row - k + stamp.shape[0])
+        b1 = min(self.nbytes, left // 8 + stamp.shape[1])
+        if r1 <= r0 or b1 <= b0:
+            return 0
+        patch = stamp[sr0:sr0 + r1 - r0, sb0:sb0 + b1 - b0]
+
+        old = self.bits[r0:r1, b0:b1]
+        fresh = patch & ~old & self.inside[r0:r1, b0:b1]
+        if not fresh.any():
+            return 0
+        old |= fresh
+        added = int(POPCOUNT[fresh].sum())
+        self.covered += added
+
+        # Per-block bookkeeping for the fresh bits only
+        rr, cc = np.nonzero(np.unpackbits(fresh, axis=1))
+        np.subtract.at(self.block_open, ((rr + r0) // BLOCK, (cc + b0 * 8) // BLOCK), 1)
+        return added
+
+    def percent(self):
+        return 100.0 * self.covered / self.inside_count if self.inside_count else 100.0
+
+    def is_covered(self, north, east):
+        row, col = self.cell_of(north, east)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
+        return bool((self.bits[row, col >> 3] >> (7 - (col & 7))) & 1)
+
+    def nearest_uncovered(self, north, east):
+        """(north, east) centre of the closest uncovered arena cell, or None when all are covered."""
+        open_blocks = np.argwhere(self.block_open > 0)
+        if len(open_blocks) == 0:
+            return None
+        row, col = self.cell_of(north, east)
+        # Distance to each open block's rectangle bounds the distance to any cell in it
+        lo_n, lo_e = open_blocks[:, 0] * BLOCK, open_blocks[:, 1] * BLOCK
+        dn = np.maximum(0, np.maximum(lo_n - row, row - (lo_n + BLOCK - 1)))
+        de = np.maximum(0, np.maximum(lo_e - col, col - (lo_e + BLOCK - 1)))
+        bound = np.hypot(dn, de)
+        best, best_cell = math.inf, None
+        for i in np.argsort(bound):
+            if bound[i] > best:
+                break
+            br, bc = open_blocks[i] * BLOCK
+            r1, c1 = min(br + BLOCK, self.rows), min(bc + BLOCK, self.cols)
+            bits = np.unpackbits(self.bits[br:r1], axis=1)[:, bc:c1].astype(bool)
+            inside = np.unpackbits(self.inside[br:r1], axis=1)[:, bc:c1].astype(bool)
+            rr, cc = np.nonzero(inside & ~bits)
+            if len(rr) == 0:
+                continue
+            d = np.hypot(rr + br - row, cc + bc - col)
+            j = int(np.argmin(d))
+            if d[j] < best:
+                best, best_cell = d[j], (rr[j] + br, cc[j] + bc)
+        if best_cell is None:
+            return None
+        return (self.origin[0] + (best_cell[0] + 0.5) * self.cell_m,
+                self.origin[1] + (best_cell[1] + 0.5) * self.cell_m)
+
+    def lane_coverage(self, start, end, width_m=None):
+        """Fraction of the arena cells in a lane's swath (start -> end, width_m wide) already covered."""
+        if width_m is None:
+            width_m = 2 * self._stamp_k * self.cell_m
+        start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+        length = float(np.hypot(*(end - start)))
+        if length == 0:
+            return 1.0
+        along = (end - start) / length
+        across = np.array([-along[1], along[0]])
+        s = np.arange(0.0, length + self.cell_m / 2, self.cell_m)
+        w = np.arange(-width_m / 2, width_m / 2 + self.cell_m / 2, self.cell_m)
+        pts = start + s[:, None, None] * along + w[None, :, None] * across
+        rows = ((pts[..., 0] - self.origin[0]) // self.cell_m).astype(int).ravel()
+        cols = ((pts[..., 1] - self.origin[1]) // self.cell_m).astype(int).ravel()
+        ok = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        rows, cols = rows[ok], cols[ok]
+        shift = 7 - (cols & 7)
+        inside = (self.inside[rows, cols >> 3] >> shift) & 1
+        covered = (self.bits[rows, cols >> 3] >> shift) & 1
+        total = int(inside.sum())
+        return float((covered & inside).sum()) / total if total else 1.0
+
+    def is_redundant(self, start, end, threshold=0.9, width_m=None):
+        """True when at least threshold of the lane's swath is already covered."""
+        return self.lane_coverage(start, end, width_m) >= threshold
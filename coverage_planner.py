@@ -0,0 +1,190 @@
+# coverage_planner.py
+# Usage: python coverage_planner.py Missions/arena.json [spacing_m] [out.json]
+#   Prints the fastest boustrophedon pattern and optionally writes it as a
+#   mission file for mission_runner.py.
+
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+import numpy as np
+
+EPS = 1e-9
+
+CoveragePlan = namedtuple(
+    "CoveragePlan",
+    "angle_deg spacing_m waypoints lanes turns length_m time_s coverage",
+)
+
+
+def segment_time(length_m, max_speed, accel):
+    """
+    Stop-to-stop time over a straight segment with a trapezoidal speed
+    profile (triangular when too short to reach max_speed). Vectorised.
+    """
+    length_m = np.asarray(length_m, dtype=float)
+    full = length_m >= max_speed * max_speed / accel
+    return np.where(full, length_m / max_speed + max_speed / accel, 2.0 * np.sqrt(length_m / accel))
+
+
+def polygon_area(polygon):
+    n, e = np.asarray(polygon, dtype=float).T
+    return 0.5 * abs(np.dot(n, np.roll(e, -1)) - np.dot(e, np.roll(n, -1)))
+
+
+def _chords(u, v, offsets):
+    """(lo, hi) along-lane extent of the polygon on each line v = offset, all at once."""
+    u1, v1 = np.roll(u, -1), np.roll(v, -1)
+    vv = offsets[:, None]
+    # Edges parallel to the lanes (up to rounding of the rotation) never cross
+    slanted = np.abs(v1 - v) > EPS
+    crosses = (np.minimum(v, v1) - EPS <= vv) & (vv <= np.maximum(v, v1) + EPS) & slanted
+    dv = np.where(slanted, v1 - v, 1.0)
+    uu = u + (vv - v) * (u1 - u) / dv
+    return np.where(crosses, uu, np.inf).min(axis=1), np.where(crosses, uu, -np.inf).max(axis=1)
+
+
+def _lanes(polygon, angle_deg, spacing_m, margin_m):
+    theta = math.radians(angle_deg)
+    d = np.array([math.cos(theta), math.sin(theta)])
+    n = np.array([-math.sin(theta), math.cos(theta)])
+    poly = np.asarray(polygon, dtype=float)
+    u, v = poly @ d, poly @ n
+
+    v_lo, v_hi = v.min() + margin_m, v.max() - margin_m
+    width = v_hi - v_lo
+    if width <= 0:
+        return np.empty((0, 2, 2)), 0.0
+    count = max(1, int(math.ceil(width / spacing_m - 1e-9)))
+    half = 0.5 * width / count
+    # Every lane covers half a gap either side, so the first one sits half a gap in
+    offsets = v_lo + (2 * np.arange(count) + 1) * half
+
+    u_lo, u_hi = _chords(u, v, offsets)
+    u_lo, u_hi = u_lo + margin_m, u_hi - margin_m
+    keep = u_hi > u_lo
+    offsets, u_lo, u_hi = offsets[keep], u_lo[keep], u_hi[keep]
+
+    # A lane ends where its centre line meets the border; where the border is
+    # not square to the lane, the strip's corners beyond that are missed.
+    # With a straight border through the strip that is |shift| * half / 2 per end.
+    edge = np.clip(np.concatenate([offsets - half, offsets + half]), v.min(), v.max())
+    lo, hi = _chords(u, v, edge)
+    k = len(offsets)
+    missed = (np.abs(lo[k:] - lo[:k]) + np.abs(hi[k:] - hi[:k])).sum() * half / 4.0
+
+    starts = u_lo[:, None] * d + offsets[:, None] * n
+    ends = u_hi[:, None] * d + offsets[:, None] * n
+    # Rounding (and + 0.0 for -0.0) keeps rotation noise out of the waypoints
+    return np.round(np.stack([starts, ends], axis=1), 9) + 0.0, float(missed)
+
+
+def lane_segments(polygon, angle_deg, spacing_m, margin_m=0.0):
+    """
+    Parallel lanes across a convex polygon, swept along angle_deg
+    (0 = north, 90 = east). Lanes are spaced at most spacing_m apart,
+    evenly spread over the polygon's width, and kept margin_m inside it.
+    Returns a (K, 2, 2) array of (start, end) points in (north, east).
+    """
+    return _lanes(polygon, angle_deg, spacing_m, margin_m)[0]
+
+
+def _boustrophedon(lanes, reverse_order, flip_first):
+    if reverse_order:
+        lanes = lanes[::-1]
+    # Alternate lane directions: every other lane is flown end -> start
+    flip = (np.arange(len(lanes)) % 2 == 1) != flip_first
+    ordered = np.where(flip[:, None, None], lanes[:, ::-1], lanes)
+    return ordered.reshape(-1, 2)
+
+
+def evaluate(waypoints, start, max_speed, accel, turn_penalty_s):
+    """(length_m, time_s, turns) for flying start -> waypoints[0] -> ... -> waypoints[-1]."""
+    path = np.vstack([start, waypoints])
+    legs = np.hypot(*np.diff(path, axis=0).T)
+    legs = legs[legs > 1e-6]
+    turns = max(0, len(legs) - 1)
+    time_s = float(segment_time(legs, max_speed, accel).sum()) + turns * turn_penalty_s
+    return float(legs.sum()), time_s, turns
+
+
+def candidate_plans(polygon, spacing_m, max_speed=0.5, accel=0.5, start=(0.0, 0.0), angles=None,
+                    margin_m=0.0, turn_penalty_s=1.0):
+    """
+    Every boustrophedon variant over the given sweep angles: both lane
+    orders and both first-lane directions per angle.
+    """
+    if angles is None:
+        angles = np.arange(0.0, 180.0, 1.0)
+    start = np.asarray(start, dtype=float)
+    area = polygon_area(polygon)
+    plans = []
+    for angle in angles:
+        lanes, missed = _lanes(polygon, angle, spacing_m, margin_m)
+        if len(lanes) == 0:
+            continue
+        coverage = max(1e-6, 1.0 - missed / area) if area > 0 else 1.0
+        for reverse_order in (False, True):
+            for flip_first in (False, True):
+                waypoints = _boustrophedon(lanes, reverse_order, flip_first)
+                length, time_s, turns = evaluate(waypoints, start, max_speed, accel, turn_penalty_s)
+                plans.append(CoveragePlan(float(angle), spacing_m, waypoints, len(lanes), turns, length, time_s,
+                                          coverage))
+    return plans
+
+
+def _rank(plan):
+    # Time per covered area first, so cutting corners never looks faster;
+    # ties broken by fewer turns, then shorter path
+    return round(plan.time_s / plan.coverage, 6), plan.turns, plan.length_m
+
+
+def plan_coverage(polygon, spacing_m, max_speed=0.5, accel=0.5, start=(0.0, 0.0), angles=None,
+                  margin_m=0.0, turn_penalty_s=1.0):
+    """The fastest candidate of candidate_plans()."""
+    plans = candidate_plans(polygon, spacing_m, max_speed, accel, start, angles, margin_m, turn_penalty_s)
+    if not plans:
+        raise ValueError("arena is narrower than the margin, nothing to cover")
+    return min(plans, key=_rank)
+
+
+def to_mission(plan, name="Coverage", altitude_m=3.0, speed_m_s=0.5, land_at_end=True):
+    """Mission spec (see mission_plan.compile_mission) flying the plan's waypoints."""
+    legs = [{"to": [round(float(n), 3), round(float(e), 3)]} for n, e in plan.waypoints]
+    if land_at_end:
+        legs[-1]["action"] = "land"
+    return {"name": name, "altitude_m": altitude_m, "speed_m_s": speed_m_s, "legs": legs}
+
+
+def load_arena(path):
+    """Polygon from an arena JSON: {"polygon": [[n, e], ...]} or {"north": [..], "east": [..]}."""
+    with open(path, "r") as f:
+        spec = json.load(f)
+    if "polygon" in spec:
+        return np.asarray(spec["polygon"], dtype=float)
+    (n0, n1), (e0, e1) = spec["north"], spec["east"]
+    return np.array([[n0, e0], [n1, e0], [n1, e1], [n0, e1]], dtype=float)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python coverage_planner.py <arena.json> [spacing_m] [out.json]")
+        sys.exit(1)
+    arena = load_arena(sys.argv[1])
+    spacing = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    t0 = time.perf_counter()
+    candidates = candidate_plans(arena, spacing)
+    elapsed = time.perf_counter() - t0
+    best = min(candidates, key=_rank)
+    print(f"[COVERAGE] {len(candidates)} patterns in {elapsed * 1000:.0f} ms "
+          f"({len(candidates) / elapsed:.0f}/s)")
+    print(f"[COVERAGE] Best: sweep {best.angle_deg:.0f}°, {best.lanes} lanes, {best.turns} turns, "
+          f"{best.length_m:.2f} m, ~{best.time_s:.0f}s, {best.coverage * 100:.0f}% swept")
+    for n, e in best.waypoints:
+        print(f"  N={n:6.2f} E={e:6.2f}")
+    if len(sys.argv) > 3:
+        with open(sys.argv[3], "w") as f:
+            json.dump(to_mission(best), f, indent=2)
+        print(f"[COVERAGE] Mission written to {sys.argv[3]}")
@@ -0,0 +1,176 @@
+# flight_recorder.py
+
+import asyncio
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b"FREC"
+VERSION = 1
+
+# Event loop time, NED position, NED velocity, roll/pitch/yaw, sonar range,
+# flag bits and a marker byte, padded to 52 bytes
+RECORD = struct.Struct("<d10fBB2x")
+HEADER = struct.Struct("<4sHH")
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("north_m", "<f4"), ("east_m", "<f4"), ("down_m", "<f4"),
+    ("vn_m_s", "<f4"), ("ve_m_s", "<f4"), ("vd_m_s", "<f4"),
+    ("roll_deg", "<f4"), ("pitch_deg", "<f4"), ("yaw_deg", "<f4"),
+    ("sonar_m", "<f4"),
+    ("flags", "u1"),
+    ("marker", "u1"),
+    ("_pad", "V2"),
+])
+
+FLAG_ARMED = 1
+FLAG_IN_AIR = 2
+
+# Marker codes stamped on a single record by mark()
+MARK_NONE = 0
+MARK_TAKEOFF = 1
+MARK_CHECKPOINT = 2
+MARK_LAND = 3
+
+NAN = float("nan")
+
+
+class FlightRecorder:
+    """
+    Samples the TelemetryHub at a fixed rate into a preallocated ring of
+    fixed-width binary records and writes them out in batches from a worker
+    thread, so file I/O never runs on the event loop.
+
+    fsync_interval_s: None never fsyncs, 0 fsyncs after every batch, a
+    positive value fsyncs at most that often.
+    """
+
+    def __init__(self, hub, path="flight_log.bin", rate_hz=50, capacity=4096, batch=256,
+                 fsync_interval_s=1.0):
+        self.hub = hub
+        self.path = path
+        self.period = 1.0 / rate_hz
+        self.capacity = capacity
+        self.batch = batch
+        self.fsync_interval_s = fsync_interval_s
+        self._buf = bytearray(RECORD.size * capacity)
+        self._head = 0
+        self._tail = 0
+        self._marker = MARK_NONE
+        self._file = None
+        self._task = None
+        self._flush_task = None
+        self._last_fsync = 0.0
+        self.dropped = 0
+        self.late = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def start(self):
+        self._file = open(self.path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._task = asyncio.create_task(self._run())
+        print(f"[RECORDER] Recording to {self.path} at {1.0 / self.period:.0f} Hz")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._flush()
+        self._file.close()
+        self._file = None
+        print(f"[RECORDER] Stopped, {self._head} records ({self.dropped} dropped, {self.late} late)")
+
+    def mark(self, code):
+        """Stamp the next record with a marker code (MARK_*)."""
+        self._marker = code
+
+    def _sample(self):
+        hub = self.hub
+        pv = hub.latest("position_velocity_ned")
+        euler = hub.latest("attitude_euler")
+        sonar = hub.latest("distance_sensor")
+        flags = (FLAG_ARMED if hub.latest("armed") else 0) | (FLAG_IN_AIR if hub.latest("in_air") else 0)
+
+        if pv is not None:
+            p, v = pv.position, pv.velocity
+            ned = (p.north_m, p.east_m, p.down_m, v.north_m_s, v.east_m_s, v.down_m_s)
+        else:
+            ned = (NAN,) * 6
+        att = (euler.roll_deg, euler.pitch_deg, euler.yaw_deg) if euler is not None else (NAN,) * 3
+        rng = sonar.current_distance_m if sonar is not None else NAN
+
+        if self._head - self._tail >= self.capacity:
+            # Writer fell behind a full ring: drop the oldest record
+            self._tail += 1
+            self.dropped += 1
+        slot = self._head % self.capacity
+        RECORD.pack_into(self._buf, slot * RECORD.size, asyncio.get_running_loop().time(), *ned, *att, rng, flags, self._marker)
+        self._marker = MARK_NONE
+        self._head += 1
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        next_t = loop.time()
+        while True:
+            self._sample()
+            if self._head - self._tail >= self.batch and (self._flush_task is None or self._flush_task.done()):
+                self._flush_task = asyncio.create_task(self._flush())
+            # Absolute deadlines so scheduling delays do not accumulate
+            next_t += self.period
+            delay = next_t - loop.time()
+            if delay < 0:
+                self.late += 1
+                next_t = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _take_pending(self):
+        start, end = self._tail, self._head
+        if start == end:
+            return b""
+        a, b = start % self.capacity, end % self.capacity
+        size = RECORD.size
+        if a < b:
+            chunk = bytes(self._buf[a * size:b * size])
+        else:
+            chunk = bytes(self._buf[a * size:]) + bytes(self._buf[:b * size])
+        self._tail = end
+        return chunk
+
+    async def _flush(self):
+        chunk = self._take_pending()
+        if chunk:
+            await asyncio.get_event_loop().run_in_executor(None, self._write, chunk)
+
+    def _write(self, chunk):
+        self._file.write(chunk)
+        self._file.flush()
+        if self.fsync_interval_s is None:
+            return
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval_s:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+
+def read_records(path):
+    """Load a recorder file as a NumPy structured array of RECORD_DTYPE."""
+    with open(path, "rb") as f:
+        magic, version, size = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a version {VERSION} flight recorder file")
+        data = f.read()
+    usable = len(data) - len(data) % size
+    return np.frombuffer(data[:usable], dtype=RECORD_DTYPE)
@@ -0,0 +1,265 @@
+# frame_bus.py
+# Usage: python frame_bus.py [camera_index | "Frames/*.npy"] [workers] [fps]
+#   Runs capture and detector processes and prints what comes back, the way
+#   Rastar_Search.py would consume it.
+
+import asyncio
+import multiprocessing as mp
+import queue
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+from yellow_detector import YellowDetector, camera_frames, file_frames
+
+FrameEvent = namedtuple("FrameEvent", "worker frame_no latency_ms detection")
+
+HEADER_ALIGN = 64
+# spawn, not fork: the mission process already runs gRPC and asyncio threads
+_ctx = mp.get_context("spawn")
+
+
+class FrameRing:
+    """
+    Fixed-size ring of frames in one shared memory block.
+
+    The header holds the number of frames written, then per slot the frame
+    number it holds (-1 while being written) and its capture time. Readers
+    get a numpy view straight into the slot, and check valid() after using
+    it: if the writer has lapped the ring meanwhile, the result is stale.
+    """
+
+    def __init__(self, shape, dtype=np.uint8, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        header = 8 * (1 + 2 * slots)
+        self._offset = -(-header // HEADER_ALIGN) * HEADER_ALIGN
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self._offset + slots * frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buf = self.shm.buf
+        self._count = np.ndarray((1,), np.int64, buf, 0)
+        self._frame_no = np.ndarray((slots,), np.int64, buf, 8)
+        self._stamp = np.ndarray((slots,), np.float64, buf, 8 + 8 * slots)
+        self.frames = np.ndarray((slots,) + self.shape, self.dtype, buf, self._offset)
+        if name is None:
+            self._count[0] = 0
+            self._frame_no[:] = -1
+
+    @property
+    def spec(self):
+        """What another process needs to attach: FrameRing(*ring.spec)."""
+        return self.shape, self.dtype.str, self.slots, self.shm.name
+
+    @property
+    def count(self):
+        return int(self._count[0])
+
+    def write(self, frame):
+        n = int(self._count[0])
+        slot = n % self.slots
+        self._frame_no[slot] = -1
+        self.frames[slot] = frame
+        self._stamp[slot] = time.monotonic()
+        self._frame_no[slot] = n
+        self._count[0] = n + 1
+        return n
+
+    def read(self, n):
+        """(view, capture_time) of frame n, or None if it is not (or no longer) in the ring."""
+        slot = n % self.slots
+        if self._frame_no[slot] != n:
+            return None
+        return self.frames[slot], float(self._stamp[slot])
+
+    def valid(self, n):
+        return self._frame_no[n % self.slots] == n
+
+    def close(self):
+        # Views must go before the buffer can be released
+        self._count = self._frame_no = self._stamp = self.frames = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _capture(spec, source, fps, ready, stop):
+    ring = FrameRing(*spec)
+    frames = camera_frames(source) if isinstance(source, int) else file_frames(source)
+    period = 1.0 / fps if fps else 0.0
+    next_t = time.monotonic()
+    skipped = 0
+    try:
+        for _, frame in frames:
+            if stop.is_set():
+                break
+            if frame.shape != ring.shape:
+                # One line, not one per frame: a wrong camera mode mismatches every frame
+                if not skipped:
+                    print(f"[BUS] Frame {frame.shape} does not fit the ring {ring.shape}, skipping such frames")
+                skipped += 1
+                continue
+            if period:
+                next_t += period
+                time.sleep(max(0.0, next_t - time.monotonic()))
+            n = ring.write(frame)
+            ready[n % len(ready)].release()
+    finally:
+        if skipped:
+            print(f"[BUS] {skipped} frames skipped for not fitting the ring")
+        ring.close()
+
+
+def _detect(spec, worker, ready, results, stop, options):
+    ring = FrameRing(*spec)
+    detector = YellowDetector(**options)
+    workers = len(ready)
+    done = -1
+    try:
+        while not stop.is_set():
+            if not ready[worker].acquire(timeout=0.5):
+                continue
+            # Newest frame of this worker's share; anything older is dropped
+            latest = ring.count - 1
+            n = latest - (latest - worker) % workers
+            if n <= done:
+                continue
+            item = ring.read(n)
+            if item is None:
+                continue
+            view, stamp = item
+            detection = detector.detect(view)
+            if not ring.valid(n):
+                continue
+            done = n
+            results.put(FrameEvent(worker, n, (time.monotonic() - stamp) * 1000, detection))
+    finally:
+        ring.close()
+
+
+class FrameBus:
+    """
+    Capture and detector processes around a shared FrameRing.
+
+    The capture process writes each frame once into the ring and wakes the
+    worker whose turn it is (frame number modulo workers), so the load is
+    spread over cores and no frame is pickled or copied. Workers send back
+    a FrameEvent per frame; a reader thread hands them to on_event on the
+    asyncio loop, so the mission process only ever sees small events.
+    """
+
+    def __init__(self, source, on_event, shape=(480, 640, 3), workers=2, slots=4, fps=None, detector=None):
+        self.source = source
+        self.on_event = on_event
+        self.shape = shape
+        self.workers = workers
+        self.slots = max(slots, workers + 2)
+        self.fps = fps
+        self.detector = detector or {"scale": 2}
+        self.events = 0
+        self.stale = 0
+        self._ring = None
+        self._procs = []
+        self._task = None
+        self._stop = None
+        self._ready = None
+        self._results = None
+
+    def start(self):
+        self._ring = FrameRing(self.shape, np.uint8, self.slots)
+        self._stop = _ctx.Event()
+        self._results = _ctx.Queue()
+        # Kept on self: spawned children unpickle these after start() returns
+        self._ready = ready = [_ctx.Semaphore(0) for _ in range(self.workers)]
+        spec = self._ring.spec
+        self._procs = [
+            _ctx.Process(target=_detect, args=(spec, w, ready, self._results, self._stop, self.detector),
+                         daemon=True)
+            for w in range(self.workers)
+        ]
+        self._procs.append(_ctx.Process(target=_capture, args=(spec, self.source, self.fps, ready, self._stop),
+                                        daemon=True))
+        for proc in self._procs:
+            proc.start()
+        self._task = asyncio.create_task(self._drain())
+        print(f"[BUS] Capture + {self.workers} detector processes on {self._ring.shm.name}")
+
+    def _get(self):
+        try:
+            return self._results.get(timeout=0.25)
+        except queue.Empty:
+            return None
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        last = -1
+        while True:
+            event = await loop.run_in_executor(None, self._get)
+            if event is None:
+                continue
+            self.events += 1
+            # Workers finish out of order; an older frame never overrides a newer one
+            if event.frame_no < last:
+                self.stale += 1
+                continue
+            last = event.frame_no
+            self.on_event(event)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._stop is not None:
+            self._stop.set()
+        # join() blocks, so it runs in the executor, all processes at once
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, proc.join, 2) for proc in self._procs))
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+        if self._ring is not None:
+            print(f"[BUS] {self._ring.count} frames captured, {self.events} results, {self.stale} out of order")
+            self._ring.close()
+            self._ring.unlink()
+            self._ring = None
+
+
+async def _main(source, workers, fps):
+    latencies = []
+
+    def on_event(event):
+        latencies.append(event.latency_ms)
+        if event.detection.found:
+            print(f"[BUS] Frame {event.frame_no} (worker {event.worker}): yellow "
+                  f"{event.detection.area_frac * 100:.1f}%, {event.latency_ms:.1f} ms after capture")
+
+    bus = FrameBus(source, on_event, workers=workers, fps=fps)
+    bus.start()
+    try:
+        while all(p.is_alive() for p in bus._procs[-1:]):
+            await asyncio.sleep(0.5)
+        await asyncio.sleep(0.5)
+    finally:
+        await bus.stop()
+    if latencies:
+        print(f"[BUS] Latency {np.mean(latencies):.1f} ms mean, {np.max(latencies):.1f} ms max")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    source = args[0] if args else "0"
+    source = int(source) if source.isdigit() else [source]
+    workers = int(args[1]) if len(args) > 1 else 2
+    fps = float(args[2]) if len(args) > 2 else (None if isinstance(source, int) else 30.0)
+    try:
+        asyncio.run(_main(source, workers, fps))
+    except KeyboardInterrupt:
+        pass
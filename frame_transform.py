@@ -0,0 +1,111 @@
+# frame_transform.py
+
+import math
+import numpy as np
+from mavsdk.offboard import VelocityNedYaw
+
+
+def wrap_deg(angle):
+    """Wrap an angle to [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class HeadingFrame:
+    """
+    Body/arena-frame to NED rotation for a captured heading.
+
+    Replaces the per-command radians/cos/sin of rotate_velocity_ned: the
+    rotation is computed once per capture and reused.
+
+    The arena does not turn with the vehicle, so ordinary yawing (setpoints
+    command yaw 0, which turns the vehicle north) never moves the frame.
+    With a hub attached, every attitude_euler sample is compared with the
+    previous one: a step larger than threshold_deg that is also faster
+    than max_rate_deg_s is an EKF yaw reset, not a turn, and the heading
+    is shifted by the same step so the frame stays fixed to the ground.
+    """
+
+    def __init__(self, heading_deg, hub=None, threshold_deg=20.0, max_rate_deg_s=180.0):
+        self.threshold_deg = threshold_deg
+        self.max_rate_deg_s = max_rate_deg_s
+        self.captures = 0
+        self.resets = 0
+        self._set(heading_deg)
+        self.hub = None
+        self._last = None
+        if hub is not None:
+            self.attach(hub)
+
+    @classmethod
+    async def capture(cls, hub, threshold_deg=20.0, max_rate_deg_s=180.0):
+        euler = await hub.get("attitude_euler")
+        print(f"[INFO] Initial Heading (Yaw): {euler.yaw_deg:.2f}°")
+        return cls(euler.yaw_deg, hub, threshold_deg, max_rate_deg_s)
+
+    def attach(self, hub):
+        """Watch hub's attitude_euler samples for EKF yaw resets."""
+        self.hub = hub
+        sample = hub.latest("attitude_euler")
+        self._last = (sample.yaw_deg, hub.timestamp("attitude_euler")) if sample is not None else None
+        hub.subscribe("attitude_euler", self._on_attitude)
+
+    def detach(self):
+        if self.hub is not None:
+            self.hub.unsubscribe("attitude_euler", self._on_attitude)
+            self.hub = None
+
+    def _on_attitude(self, euler):
+        self.observe(euler.yaw_deg, self.hub.timestamp("attitude_euler"))
+
+    def observe(self, yaw_deg, stamp):
+        """Feed one yaw sample; returns the step applied when it was a reset, else 0.0."""
+        last, self._last = self._last, (yaw_deg, stamp)
+        if last is None:
+            return 0.0
+        step = wrap_deg(yaw_deg - last[0])
+        dt = stamp - last[1]
+        if abs(step) <= self.threshold_deg or (dt > 0 and abs(step) / dt <= self.max_rate_deg_s):
+            return 0.0
+        self.resets += 1
+        print(f"[FRAME] EKF yaw reset of {step:+.2f}°")
+        self.recapture(wrap_deg(self.heading_deg + step))
+        return step
+
+    def check_reset(self):
+        """Run the latest attitude sample through the reset check now, e.g. right after a re-takeoff."""
+        if self.hub is None:
+            return 0.0
+        sample = self.hub.latest("attitude_euler")
+        stamp = self.hub.timestamp("attitude_euler")
+        if sample is None or (self._last is not None and self._last[1] == stamp):
+            return 0.0
+        return self.observe(sample.yaw_deg, stamp)
+
+    def _set(self, heading_deg):
+        self.heading_deg = heading_deg
+        theta = math.radians(heading_deg)
+        self._cos = math.cos(theta)
+        self._sin = math.sin(theta)
+        self.matrix = np.array([[self._cos, -self._sin], [self._sin, self._cos]])
+        self.captures += 1
+
+    def recapture(self, heading_deg):
+        print(f"[FRAME] Heading re-captured: {self.heading_deg:.2f}° -> {heading_deg:.2f}°")
+        self._set(heading_deg)
+
+    def to_ned(self, vx, vy):
+        """Rotate one (forward, right) vector into (north, east)."""
+        return vx * self._cos - vy * self._sin, vx * self._sin + vy * self._cos
+
+    def to_ned_batch(self, vectors):
+        """Rotate an (N, 2) array of (forward, right) vectors into (north, east)."""
+        return np.asarray(vectors, dtype=float) @ self.matrix.T
+
+    def from_ned_batch(self, vectors):
+        """Inverse of to_ned_batch: (north, east) back into (forward, right)."""
+        return np.asarray(vectors, dtype=float) @ self.matrix
+
+    def velocity(self, vx, vy, vz=0.0, yaw_deg=0.0):
+        """VelocityNedYaw for a (forward, right) velocity in this frame."""
+        north, east = self.to_ned(vx, vy)
+        return VelocityNedYaw(north, east, vz, yaw_deg)
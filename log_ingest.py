@@ -0,0 +1,201 @@
+# log_ingest.py
+
+import hashlib
+import os
+import re
+import sys
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".log_cache")
+CACHE_VERSION = 1
+
+SAMPLE_DTYPE = np.dtype([
+    ("leg", "<i4"),
+    ("t", "datetime64[us]"),
+    ("x_m", "<f4"), ("y_m", "<f4"), ("z_m", "<f4"),
+])
+
+EVENT_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("leg", "<i4"),
+    ("checkpoint", "<i2"),
+    ("t", "datetime64[us]"),
+    ("x_m", "<f4"), ("y_m", "<f4"), ("z_m", "<f4"),
+])
+
+# Event kinds
+EVENT_MISSION_START = 0
+EVENT_LAND_RELATIVE = 1
+EVENT_CUMULATIVE = 2
+EVENT_CHECKPOINT = 3
+
+EVENT_NAMES = {
+    EVENT_MISSION_START: "MISSION START",
+    EVENT_LAND_RELATIVE: "LAND (relative)",
+    EVENT_CUMULATIVE: "CUMULATIVE DISPLACEMENT",
+    EVENT_CHECKPOINT: "CHECKPOINT REACHED",
+}
+
+_SAMPLE_RE = re.compile(r"^(\S+) \| X: (\S+) m, Y: (\S+) m, Z: (\S+) m")
+_XYZ_RE = re.compile(r"X=(\S+) m, Y=(\S+) m, Z=(\S+) m(?: at (\S+))?")
+_CHECKPOINT_RE = re.compile(r"^CHECKPOINT (?:(\d+) )?REACHED a+t (\S+)")
+_START_RE = re.compile(r"^=== Mission Log Started at (\S+) ===")
+
+NAT = "NaT"
+
+
+class FlightLog:
+    """
+    Columnar view of one text flight log.
+
+    samples is a structured array of every "<ts> | X: .. m, Y: .. m, Z: .. m"
+    line with the leg it belongs to; a new leg starts after each
+    LAND (relative) line. events holds the marker lines as a separate table.
+    """
+
+    def __init__(self, path, sha1, samples, events):
+        self.path = path
+        self.sha1 = sha1
+        self.samples = samples
+        self.events = events
+        # Legs are contiguous, so each leg is a slice of samples
+        legs = samples["leg"]
+        self._bounds = np.flatnonzero(np.diff(legs)) + 1 if len(legs) else np.array([], dtype=np.intp)
+
+    @property
+    def n_legs(self):
+        if len(self.events) == 0 and len(self.samples) == 0:
+            return 0
+        last_sample = int(self.samples["leg"][-1]) if len(self.samples) else -1
+        last_event = int(self.events["leg"].max()) if len(self.events) else -1
+        return max(last_sample, last_event) + 1
+
+    def legs(self):
+        """One samples array (a view, no copy) per leg that has samples."""
+        return np.split(self.samples, self._bounds)
+
+    def leg(self, index):
+        return self.samples[self.samples["leg"] == index]
+
+    def events_of(self, kind):
+        return self.events[self.events["kind"] == kind]
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_log(path):
+    """Stream a text log line by line into (samples, events) arrays."""
+    leg = 0
+    s_leg, s_t, s_xyz = [], [], []
+    e_kind, e_leg, e_cp, e_t, e_xyz = [], [], [], [], []
+    pending_cumulative = False
+
+    def add_event(kind, event_leg, checkpoint, t, xyz):
+        e_kind.append(kind)
+        e_leg.append(event_leg)
+        e_cp.append(checkpoint)
+        e_t.append(t)
+        e_xyz.append(xyz)
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            # Sample lines are the bulk of every file, test them first
+            if " | X: " in line:
+                m = _SAMPLE_RE.match(line)
+                if m:
+                    s_leg.append(leg)
+                    s_t.append(m.group(1))
+                    s_xyz.append((float(m.group(2)), float(m.group(3)), float(m.group(4))))
+                continue
+            if pending_cumulative:
+                pending_cumulative = False
+                m = _XYZ_RE.match(line)
+                if m:
+                    # Belongs to the leg that just landed
+                    add_event(EVENT_CUMULATIVE, leg - 1, -1, NAT, tuple(float(v) for v in m.group(1, 2, 3)))
+                    continue
+            if line.startswith("LAND (relative)"):
+                m = _XYZ_RE.search(line)
+                if m:
+                    add_event(EVENT_LAND_RELATIVE, leg, -1, m.group(4) or NAT,
+                              tuple(float(v) for v in m.group(1, 2, 3)))
+                leg += 1
+            elif line.startswith("CUMULATIVE DISPLACEMENT"):
+                pending_cumulative = True
+            elif line.startswith("CHECKPOINT"):
+                m = _CHECKPOINT_RE.match(line)
+                if m:
+                    add_event(EVENT_CHECKPOINT, leg, int(m.group(1)) if m.group(1) else -1, m.group(2),
+                              (np.nan, np.nan, np.nan))
+            elif line.startswith("==="):
+                m = _START_RE.match(line)
+                if m:
+                    add_event(EVENT_MISSION_START, leg, -1, m.group(1), (np.nan, np.nan, np.nan))
+
+    samples = np.empty(len(s_leg), dtype=SAMPLE_DTYPE)
+    samples["leg"] = s_leg
+    # One vectorised ISO-8601 conversion for the whole column
+    samples["t"] = np.array(s_t, dtype="datetime64[us]")
+    xyz = np.array(s_xyz, dtype=np.float32).reshape(-1, 3)
+    samples["x_m"], samples["y_m"], samples["z_m"] = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+
+    events = np.empty(len(e_kind), dtype=EVENT_DTYPE)
+    events["kind"] = e_kind
+    events["leg"] = e_leg
+    events["checkpoint"] = e_cp
+    events["t"] = np.array(e_t, dtype="datetime64[us]")
+    xyz = np.array(e_xyz, dtype=np.float32).reshape(-1, 3)
+    events["x_m"], events["y_m"], events["z_m"] = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    return samples, events
+
+
+def load_log(path, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Parse a text log, reusing the .npz cached under its SHA-1 when the
+    file has been seen before.
+    """
+    sha1 = file_sha1(path)
+    cache_path = os.path.join(cache_dir, f"{sha1}.v{CACHE_VERSION}.npz")
+    if use_cache and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return FlightLog(path, sha1, cached["samples"], cached["events"])
+
+    samples, events = parse_log(path)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, samples=samples, events=events)
+        os.replace(tmp_path, cache_path)
+    return FlightLog(path, sha1, samples, events)
+
+
+def load_logs(paths, cache_dir=CACHE_DIR, use_cache=True):
+    return [load_log(path, cache_dir, use_cache) for path in paths]
+
+
+def summarize(log):
+    print(f"[LOG] {log.path} ({log.sha1[:10]})")
+    print(f"[LOG] {len(log.samples)} samples in {log.n_legs} legs, {len(log.events)} events")
+    for leg in log.legs():
+        if len(leg) == 0:
+            continue
+        span = (leg["t"][-1] - leg["t"][0]) / np.timedelta64(1, "s")
+        print(f"  leg {int(leg['leg'][0])}: {len(leg)} samples over {span:.1f}s, "
+              f"end X={leg['x_m'][-1]:.2f} Y={leg['y_m'][-1]:.2f} Z={leg['z_m'][-1]:.2f}")
+    for event in log.events:
+        print(f"  {EVENT_NAMES[int(event['kind'])]} leg {int(event['leg'])}: "
+              f"X={event['x_m']:.2f} Y={event['y_m']:.2f} Z={event['z_m']:.2f} at {event['t']}")
+
+
+if __name__ == "__main__":
+    for log_path in sys.argv[1:]:
+        summarize(load_log(log_path))
@@ -5,78 +5,99 @@ import sys
 from mavsdk import System
 from mavsdk.offboard import OffboardError, VelocityNedYaw
 
+from setpoint_streamer import SetpointStreamer
+from stream_rates import apply_profile
 
-async def connect_drone(use_udp=True):
-    if use_udp:
+SERIAL_ADDRESS = "serial:///dev/ttyACM0:57600"
+SERIAL_BAUD = 57600
+
+
+async def connect_drone(use_udp=True, direct=False, rates="leg"):
+    if direct:
+        # Straight MAVLink to mavproxy's output, no mavsdk_server in between
+        from mavlink_system import MavlinkSystem
+        print("[CONNECT] Connecting via MAVLink (udp:127.0.0.1:14550)...")
+        drone = MavlinkSystem()
+        await drone.connect()
+    elif use_udp:
         print("[CONNECT] Connecting via UDP (telemetry)...")
         drone = System(mavsdk_server_address="localhost", port=50051)
         await drone.connect()
     else:
         print("[CONNECT] Connecting via SERIAL (/dev/ttyACM0)...")
         drone = System()
-        await drone.connect(system_address="serial:///dev/ttyACM0:57600")
+        await drone.connect(system_address=SERIAL_ADDRESS)
 
     # Wait until connected
     async for state in drone.core.connection_state():
         if state.is_connected:
             print("[INFO] Drone connected!")
             break
+
+    # Telemetry rates from a profile (stream_rates.PROFILES), fitted to the
+    # serial link's bandwidth when on serial; None keeps the autopilot's own
+    if rates is not None:
+        await apply_profile(drone, rates, baud=None if use_udp or direct else SERIAL_BAUD)
     return drone
 
 
-async def arm_and_start_offboard(drone):
+async def arm_and_start_offboard(drone, setpoints):
     print("[ARM] Arming drone...")
     await drone.action.arm()
-    await drone.offboard.set_velocity_ned(VelocityNedYaw(0, 0, 0, 0))
+    setpoints.set_velocity_ned(VelocityNedYaw(0, 0, 0, 0))
+    await setpoints.start()
     try:
         await drone.offboard.start()
         print("[OFFBOARD] Started offboard control")
     except OffboardError as e:
         print(f"[ERROR] Offboard start failed: {e._result.result}")
+        await setpoints.stop()
         await drone.action.disarm()
         raise e
 
 
-async def send_velocity(drone, vx, vy, vz, duration_sec):
+async def send_velocity(setpoints, vx, vy, vz, duration_sec):
+    # The streamer keeps re-sending the target; only the swap happens here
     print(f"[MOVE] Velocity (vx={vx}, vy={vy}, vz={vz}) for {duration_sec}s")
-    for _ in range(int(duration_sec * 10)):
-        await drone.offboard.set_velocity_ned(VelocityNedYaw(vx, vy, vz, 0.0))
-        await asyncio.sleep(0.1)
+    setpoints.set_velocity_ned(VelocityNedYaw(vx, vy, vz, 0.0))
+    await asyncio.sleep(duration_sec)
 
 
-async def emergency_brake(drone):
+async def emergency_brake(setpoints):
     print("[BRAKE] Emergency stop")
-    await send_velocity(drone, 0, 0, 0, 1)
+    await send_velocity(setpoints, 0, 0, 0, 1)
 
 
 async def main():
     use_udp = True  # Set to False if you want to use SERIAL USB
     drone = await connect_drone(use_udp)
+    setpoints = SetpointStreamer(drone, rate_hz=20)
 
     try:
-        await arm_and_start_offboard(drone)
+        await arm_and_start_offboard(drone, setpoints)
 
         # Ascend
-        await send_velocity(drone, 0, 0, -0.5, 4)
-        await emergency_brake(drone)
+        await send_velocity(setpoints, 0, 0, -0.5, 4)
+        await emergency_brake(setpoints)
         await asyncio.sleep(2)
 
         # Move forward
-        await send_velocity(drone, 0.5, 0, 0, 3)
-        await emergency_brake(drone)
+        await send_velocity(setpoints, 0.5, 0, 0, 3)
+        await emergency_brake(setpoints)
         await asyncio.sleep(2)
 
         # Move right
-        await send_velocity(drone, 0, 0.5, 0, 3)
-        await emergency_brake(drone)
+        await send_velocity(setpoints, 0, 0.5, 0, 3)
+        await emergency_brake(setpoints)
         await asyncio.sleep(2)
 
         # Descend
-        await send_velocity(drone, 0, 0, 0.5, 3)
-        await emergency_brake(drone)
+        await send_velocity(setpoints, 0, 0, 0.5, 3)
+        await emergency_brake(setpoints)
         await asyncio.sleep(2)
 
         # Land
+        await setpoints.stop()
         print("[LAND] Initiating landing...")
         await drone.action.land()
         await asyncio.sleep(10)
@@ -86,6 +107,7 @@ async def main():
         print("[DONE]")
 
     finally:
+        await setpoints.stop()
         print("[CLOSE] Exiting script")
 
 
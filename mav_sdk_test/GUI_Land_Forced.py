@@ -1,9 +1,14 @@
-from flask import Flask, jsonify, render_template_string, request
+import os
+import sys
+from flask import Flask, Response, jsonify, render_template_string, request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from command_channel import CommandBoard, notify_drone
 
 app = Flask(__name__)
 
 # This flag tells the drone whether it should land.
-land_requested = False
+board = CommandBoard(("LAND",))
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -23,28 +28,39 @@ HTML_TEMPLATE = """
 
 @app.route("/")
 def index():
-    status = "LAND request active" if land_requested else "Idle"
+    status = "LAND request active" if board.is_active("LAND") else "Idle"
     return render_template_string(HTML_TEMPLATE, status=status)
 
 @app.route("/land", methods=["POST"])
 def trigger_land():
-    global land_requested
-    land_requested = True
+    board.trigger("LAND")
+    notify_drone("LAND")
     return render_template_string(HTML_TEMPLATE, status="LAND request active")
 
 @app.route("/land_status")
 def land_status():
-    global land_requested
-    if land_requested:
+    if board.is_active("LAND"):
         return "LAND"
     else:
         return "IDLE"
 
 @app.route("/reset_land", methods=["POST"])
 def reset_land():
-    global land_requested
-    land_requested = False
+    board.reset("LAND")
     return "OK"
 
+@app.route("/consume/land", methods=["POST"])
+def consume_land():
+    active, seq = board.consume("LAND")
+    return jsonify(command="LAND", active=active, seq=seq)
+
+@app.route("/events")
+def events():
+    # Server-sent events: one line per LAND press with its sequence number
+    last_id = request.headers.get("Last-Event-ID")
+    last_seq = int(last_id) if last_id and last_id.isdigit() else None
+    return Response(board.stream(last_seq), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
-    app.run(port=8000, debug=False, host="0.0.0.0")
+    app.run(port=8000, debug=False, host="0.0.0.0", threaded=True)
@@ -1,11 +1,19 @@
 import asyncio
-import math
 import requests
+import os
+import sys
 from datetime import datetime
 from mavsdk import System
 from mavsdk.offboard import VelocityNedYaw, OffboardError
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from telemetry_hub import TelemetryHub
+from position_source import PositionSource
+from frame_transform import HeadingFrame
+from flight_recorder import FlightRecorder, MARK_TAKEOFF, MARK_CHECKPOINT, MARK_LAND
+
 LOG_FILE = "flight_log.txt"
+RECORD_FILE = "flight_log.bin"
 
 async def wait_for_altitude(drone, target_alt, percent=0.9):
     threshold = target_alt * percent
@@ -79,24 +87,6 @@ async def land_command_listener(drone, stop_flag):
             print(f"[LISTENER] Error: {e}")
         await asyncio.sleep(1)
 
-async def log_position(drone, stop_event, start_lat, start_lon, start_alt):
-    print("[LOGGER] Started logging position...")
-    async for position in drone.telemetry.position():
-        timestamp = datetime.utcnow().isoformat()
-        mean_lat_rad = math.radians((position.latitude_deg + start_lat) / 2.0)
-        delta_x = (position.latitude_deg - start_lat) * 111320
-        delta_y = (position.longitude_deg - start_lon) * (40075000 * math.cos(mean_lat_rad) / 360)
-        delta_z = position.relative_altitude_m - start_alt
-
-        line = f"{timestamp} | X: {delta_x:.2f} m, Y: {delta_y:.2f} m, Z: {delta_z:.2f} m\n"
-        with open(LOG_FILE, "a") as f:
-            f.write(line)
-
-        await asyncio.sleep(2)
-        if stop_event.is_set():
-            print("[LOGGER] Stopped logging position.")
-            break
-
 async def move_with_telemetry(drone, velocity_ned, duration_s):
     await drone.offboard.set_velocity_ned(velocity_ned)
     for _ in range(duration_s):
@@ -108,18 +98,6 @@ async def hold(drone, duration_s=2):
     await drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, 0.0))
     await asyncio.sleep(duration_s)
 
-async def get_initial_heading(drone):
-    async for euler in drone.telemetry.attitude_euler():
-        heading_deg = euler.yaw_deg
-        print(f"[INFO] Initial Heading (Yaw): {heading_deg:.2f}°")
-        return heading_deg
-
-def rotate_velocity_ned(vx, vy, heading_deg):
-    theta = math.radians(heading_deg)
-    new_vx = vx * math.cos(theta) - vy * math.sin(theta)
-    new_vy = vx * math.sin(theta) + vy * math.cos(theta)
-    return new_vx, new_vy
-
 async def run():
     drone = System(mavsdk_server_address="localhost", port=50051)
     await drone.connect()
@@ -130,7 +108,12 @@ async def run():
             print("[INFO] Drone connected")
             break
 
-    heading_deg = await get_initial_heading(drone)
+    hub = TelemetryHub(drone)
+    hub.start()
+    positions = PositionSource(hub)
+    frame = await HeadingFrame.capture(hub)
+    recorder = FlightRecorder(hub, RECORD_FILE)
+    recorder.start()
 
     # Overwrite the log file at mission start
     with open(LOG_FILE, "w") as f:
@@ -161,9 +144,7 @@ async def run():
                 ("Land", VelocityNedYaw(0.0, -0.3105, 0.0, 0.0), 10),
     ]
 
-    global_start_lat = None
-    global_start_lon = None
-    global_start_alt = None
+    global_start = None
 
     stop_flag = asyncio.Event()
     listener_task = asyncio.create_task(land_command_listener(drone, stop_flag))
@@ -173,29 +154,18 @@ async def run():
             print(f"\n==== {label} ====")
             await arm_and_takeoff(drone)
 
-            # Record start position
-            async for pos in drone.telemetry.position():
-                start_lat = pos.latitude_deg
-                start_lon = pos.longitude_deg
-                start_alt = pos.relative_altitude_m
-
-                if global_start_lat is None:
-                    global_start_lat = start_lat
-                    global_start_lon = start_lon
-                    global_start_alt = start_alt
+            # Record start position (local NED, same frame the autopilot uses)
+            start = await positions.get()
+            if global_start is None:
+                global_start = start
 
-                print("[LOGGER] Start position recorded")
-                break
+            print("[LOGGER] Start position recorded")
 
-            # Start logger
-            stop_event = asyncio.Event()
-            log_task = asyncio.create_task(
-                log_position(drone, stop_event, start_lat, start_lon, start_alt)
-            )
+            # Full-rate samples go to the binary recorder
+            recorder.mark(MARK_TAKEOFF)
 
             print(f"[MOVE] {label}")
-            vx_fwd, vy_fwd = rotate_velocity_ned(velocity.north_m_s, velocity.east_m_s, heading_deg)
-            velocity = VelocityNedYaw(vx_fwd, vy_fwd, 0.0, 0.0)
+            velocity = frame.velocity(velocity.north_m_s, velocity.east_m_s)
             await move_with_telemetry(drone, velocity, duration)
             await hold(drone, 1)
 
@@ -204,6 +174,7 @@ async def run():
                 timestamp = datetime.utcnow().isoformat()
                 with open(LOG_FILE, "a") as f:
                     f.write(f"CHECKPOINT REACHED aat {timestamp}\n")
+                recorder.mark(MARK_CHECKPOINT)
                 try:
                     await drone.offboard.stop()
                     print("[OFFBOARD] Stopped")
@@ -215,41 +186,34 @@ async def run():
                 await asyncio.sleep(2)
                 await wait_until_disarmed(drone)
 
-            # Stop logger
-            stop_event.set()
-            await log_task
+            recorder.mark(MARK_LAND)
 
             # Log final position and cumulative displacement
-            async for pos in drone.telemetry.position():
-                # Relative to this checkpoint takeoff
-                mean_lat_rel = math.radians((pos.latitude_deg + start_lat) / 2.0)
-                delta_x_rel = (pos.latitude_deg - start_lat) * 111320
-                delta_y_rel = (pos.longitude_deg - start_lon) * (40075000 * math.cos(mean_lat_rel) / 360)
-                delta_z_rel = pos.relative_altitude_m - start_alt
-
-                timestamp = datetime.utcnow().isoformat()
-                with open(LOG_FILE, "a") as f:
-                    f.write(
-                        f"LAND (relative): X={delta_x_rel:.2f} m, Y={delta_y_rel:.2f} m, Z={delta_z_rel:.2f} m at {timestamp}\n"
-                    )
-
-                # Cumulative from global mission start
-                mean_lat_cum = math.radians((pos.latitude_deg + global_start_lat) / 2.0)
-                delta_x_cum = (pos.latitude_deg - global_start_lat) * 111320
-                delta_y_cum = (pos.longitude_deg - global_start_lon) * (40075000 * math.cos(mean_lat_cum) / 360)
-                delta_z_cum = pos.relative_altitude_m - global_start_alt
-
-                with open(LOG_FILE, "a") as f:
-                    f.write(
-                        f"CUMULATIVE DISPLACEMENT FROM MISSION START:\n"
-                        f"X={delta_x_cum:.2f} m, Y={delta_y_cum:.2f} m, Z={delta_z_cum:.2f} m\n"
-                    )
-
-                print("[LOGGER] Cumulative displacement logged")
-                break
+            end = positions.latest()
+            # Relative to this checkpoint takeoff
+            delta_x_rel, delta_y_rel, delta_z_rel = positions.displacement(start, end)
+
+            timestamp = datetime.utcnow().isoformat()
+            with open(LOG_FILE, "a") as f:
+                f.write(
+                    f"LAND (relative): X={delta_x_rel:.2f} m, Y={delta_y_rel:.2f} m, Z={delta_z_rel:.2f} m at {timestamp}\n"
+                )
+
+            # Cumulative from global mission start
+            delta_x_cum, delta_y_cum, delta_z_cum = positions.displacement(global_start, end)
+
+            with open(LOG_FILE, "a") as f:
+                f.write(
+                    f"CUMULATIVE DISPLACEMENT FROM MISSION START:\n"
+                    f"X={delta_x_cum:.2f} m, Y={delta_y_cum:.2f} m, Z={delta_z_cum:.2f} m\n"
+                )
+
+            print("[LOGGER] Cumulative displacement logged")
     finally:
         stop_flag.set()
         await listener_task
+        await recorder.stop()
+        await hub.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,452 @@
+# mavlink_system.py
+# Drop-in for mavsdk.System that talks MAVLink straight to the autopilot
+# (ArduPilot, through mavproxy's udp:127.0.0.1:14550) without mavsdk_server.
+# Usage: python mavlink_system.py "Into the Finals/Rastar_Search.py" [udp:127.0.0.1:14550]
+
+import asyncio
+import math
+import runpy
+import sys
+import threading
+import time
+from collections import deque
+import mavsdk
+from mavsdk.action import ActionError, ActionResult
+from mavsdk.core import ConnectionState
+from mavsdk.offboard import OffboardError, OffboardResult
+from mavsdk.telemetry import TelemetryError, TelemetryResult
+from mavsdk.telemetry import DistanceSensor, EulerAngle, Position, PositionNed, PositionVelocityNed, VelocityNed
+from pymavlink import mavutil
+
+mavlink = mavutil.mavlink
+
+DEFAULT_ADDRESS = "udp:127.0.0.1:14550"
+# Same ids MAVSDK uses for itself, so the autopilot sees one GCS-like peer
+SOURCE_SYSTEM = 245
+SOURCE_COMPONENT = 190
+ACK_TIMEOUT_S = 3.0
+HEARTBEAT_TIMEOUT_S = 3.0
+# How often the receiver thread looks up from the socket to check for close()
+RECEIVE_POLL_S = 0.5
+
+# SET_POSITION_TARGET_LOCAL_NED type_mask: bits set are ignored by the autopilot
+_IGNORE_POS = 0b111
+_IGNORE_VEL = 0b111 << 3
+_IGNORE_ACC = 0b111 << 6
+_IGNORE_YAW = 1 << 10
+_IGNORE_YAW_RATE = 1 << 11
+MASK_VELOCITY_YAW = _IGNORE_POS | _IGNORE_ACC | _IGNORE_YAW_RATE
+MASK_VELOCITY_YAW_RATE = _IGNORE_POS | _IGNORE_ACC | _IGNORE_YAW
+MASK_POSITION_YAW = _IGNORE_VEL | _IGNORE_ACC | _IGNORE_YAW_RATE
+
+# Messages behind each telemetry stream, for set_rate_<stream>()
+STREAM_MESSAGES = {
+    "position": (mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,),
+    "position_velocity_ned": (mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED,),
+    "attitude_euler": (mavlink.MAVLINK_MSG_ID_ATTITUDE,),
+    "distance_sensor": (mavlink.MAVLINK_MSG_ID_DISTANCE_SENSOR,),
+    "armed": (mavlink.MAVLINK_MSG_ID_HEARTBEAT,),
+    "in_air": (mavlink.MAVLINK_MSG_ID_EXTENDED_SYS_STATE,),
+}
+
+_ACK_RESULTS = {
+    mavlink.MAV_RESULT_TEMPORARILY_REJECTED: "BUSY",
+    mavlink.MAV_RESULT_DENIED: "COMMAND_DENIED",
+    mavlink.MAV_RESULT_UNSUPPORTED: "UNSUPPORTED",
+    mavlink.MAV_RESULT_FAILED: "FAILED",
+}
+
+
+def _result(result_cls, name, text):
+    # Each mavsdk result enum has its own subset of names
+    return result_cls(getattr(result_cls.Result, name, result_cls.Result.UNKNOWN), text)
+
+
+class _Core:
+    def __init__(self, system):
+        self._system = system
+
+    async def connection_state(self):
+        while True:
+            await self._system._wait_heartbeat(1.0)
+            yield ConnectionState(self._system.is_connected())
+
+
+class _Action:
+    def __init__(self, system):
+        self._system = system
+        self._takeoff_alt_m = 2.5
+
+    @staticmethod
+    def _check(result, origin):
+        if result != mavlink.MAV_RESULT_ACCEPTED:
+            name = "TIMEOUT" if result is None else _ACK_RESULTS.get(result, "UNKNOWN")
+            raise ActionError(_result(ActionResult, name, f"MAV_RESULT {result}"), origin)
+
+    async def _command(self, command, *params, origin):
+        self._check(await self._system.command_long(command, *params), origin)
+
+    async def _mode(self, mode, origin):
+        self._check(await self._system.set_mode(mode), origin)
+
+    async def arm(self):
+        await self._command(mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1, origin="arm()")
+
+    async def disarm(self):
+        await self._command(mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0, origin="disarm()")
+
+    async def set_takeoff_altitude(self, altitude):
+        self._takeoff_alt_m = altitude
+
+    async def takeoff(self):
+        # ArduPilot only takes off in GUIDED
+        await self._mode("GUIDED", "takeoff()")
+        await self._command(mavlink.MAV_CMD_NAV_TAKEOFF, 0, 0, 0, 0, 0, 0, self._takeoff_alt_m,
+                            origin="takeoff()")
+
+    async def land(self):
+        await self._mode("LAND", "land()")
+
+    async def hold(self):
+        await self._mode("LOITER", "hold()")
+
+
+class _Offboard:
+    """
+    Offboard on ArduPilot is GUIDED plus SET_POSITION_TARGET_LOCAL_NED.
+    Setpoints are sent as given and not repeated here: ArduPilot drops a
+    velocity target after 3 s, so keep streaming (SetpointStreamer).
+    """
+
+    def __init__(self, system):
+        self._system = system
+        self._has_setpoint = False
+        self._active = False
+
+    def _send(self, frame, mask, x=0.0, y=0.0, z=0.0, vx=0.0, vy=0.0, vz=0.0, yaw=0.0, yaw_rate=0.0):
+        s = self._system
+        s.master.mav.set_position_target_local_ned_send(
+            s.boot_ms(), s.target_system, s.target_component, frame, mask,
+            x, y, z, vx, vy, vz, 0.0, 0.0, 0.0, yaw, yaw_rate)
+        self._has_setpoint = True
+
+    async def set_velocity_ned(self, velocity_ned_yaw):
+        v = velocity_ned_yaw
+        self._send(mavlink.MAV_FRAME_LOCAL_NED, MASK_VELOCITY_YAW, vx=v.north_m_s, vy=v.east_m_s,
+                   vz=v.down_m_s, yaw=math.radians(v.yaw_deg))
+
+    async def set_velocity_body(self, velocity_body_yawspeed):
+        v = velocity_body_yawspeed
+        self._send(mavlink.MAV_FRAME_BODY_OFFSET_NED, MASK_VELOCITY_YAW_RATE, vx=v.forward_m_s, vy=v.right_m_s,
+                   vz=v.down_m_s, yaw_rate=math.radians(v.yawspeed_deg_s))
+
+    async def set_position_ned(self, position_ned_yaw):
+        p = position_ned_yaw
+        self._send(mavlink.MAV_FRAME_LOCAL_NED, MASK_POSITION_YAW, x=p.north_m, y=p.east_m, z=p.down_m,
+                   yaw=math.radians(p.yaw_deg))
+
+    async def start(self):
+        if not self._has_setpoint:
+            raise OffboardError(_result(OffboardResult, "NO_SETPOINT_SET", "no setpoint"), "start()")
+        try:
+            await self._system.action._mode("GUIDED", "start()")
+        except ActionError as e:
+            raise OffboardError(_result(OffboardResult, e._result.result.name, e._result.result_str), "start()")
+        self._active = True
+
+    async def stop(self):
+        self._active = False
+        self._has_setpoint = False
+        try:
+            await self._system.action._mode("LOITER", "stop()")
+        except ActionError as e:
+            raise OffboardError(_result(OffboardResult, e._result.result.name, e._result.result_str), "stop()")
+
+    async def is_active(self):
+        return self._active and self._system.mode == "GUIDED"
+
+
+class _Telemetry:
+    """
+    Streams decoded in the system's dispatch table. Every subscriber has a
+    one-slot queue that always holds the newest sample, so a slow reader
+    skips samples instead of falling behind.
+    """
+
+    def __init__(self, system):
+        self._system = system
+        self._subscribers = {name: set() for name in STREAM_MESSAGES}
+
+    def __getattr__(self, name):
+        # set_rate_<stream>(rate_hz) asks the autopilot for that message rate
+        if name.startswith("set_rate_") and name[9:] in STREAM_MESSAGES:
+            async def set_rate(rate_hz):
+                for msg_id in STREAM_MESSAGES[name[9:]]:
+                    result = await self._system.command_long(mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, msg_id,
+                                                             1e6 / rate_hz if rate_hz > 0 else -1)
+                    if result != mavlink.MAV_RESULT_ACCEPTED:
+                        status = "TIMEOUT" if result is None else _ACK_RESULTS.get(result, "UNKNOWN")
+                        raise TelemetryError(_result(TelemetryResult, status, f"MAV_RESULT {result}"), name)
+            return set_rate
+        raise AttributeError(name)
+
+    def _publish(self, name, sample):
+        for queue in self._subscribers[name]:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(sample)
+
+    async def _stream(self, name):
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers[name].add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[name].discard(queue)
+
+    def position(self):
+        return self._stream("position")
+
+    def position_velocity_ned(self):
+        return self._stream("position_velocity_ned")
+
+    def attitude_euler(self):
+        return self._stream("attitude_euler")
+
+    def distance_sensor(self):
+        return self._stream("distance_sensor")
+
+    def armed(self):
+        return self._stream("armed")
+
+    def in_air(self):
+        return self._stream("in_air")
+
+
+class MavlinkSystem:
+    """
+    mavsdk.System look-alike over a pymavlink connection.
+
+    A receiver thread reads the socket and hands every decoded message to
+    the event loop (call_soon_threadsafe), which routes it by message id
+    to the handlers registered for it, so nothing is dropped while a
+    command waits for its ACK. A thread rather than add_reader keeps it
+    working on Windows, whose default ProactorEventLoop has no readers.
+    COMMAND_LONGs resolve futures on their COMMAND_ACK, oldest first per
+    command id, so commands can be issued back to back. Same surface as
+    SimSystem: core, action, offboard and telemetry.
+    """
+
+    def __init__(self, mavsdk_server_address=None, port=None, address=DEFAULT_ADDRESS):
+        self.address = address
+        self.master = None
+        self.target_system = 1
+        self.target_component = 1
+        self.mode = None
+        self.armed = False
+        self.last_heartbeat = None
+        self.messages = 0
+        self.core = _Core(self)
+        self.action = _Action(self)
+        self.offboard = _Offboard(self)
+        self.telemetry = _Telemetry(self)
+        self._acks = {}
+        self._heartbeat = None
+        self._tasks = []
+        self._receiver = None
+        self._closing = threading.Event()
+        self._t0 = time.monotonic()
+        self._handlers = {
+            mavlink.MAVLINK_MSG_ID_HEARTBEAT: [self._on_heartbeat],
+            mavlink.MAVLINK_MSG_ID_COMMAND_ACK: [self._on_command_ack],
+            mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED: [self._on_local_position_ned],
+            mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: [self._on_global_position_int],
+            mavlink.MAVLINK_MSG_ID_ATTITUDE: [self._on_attitude],
+            mavlink.MAVLINK_MSG_ID_DISTANCE_SENSOR: [self._on_distance_sensor],
+            mavlink.MAVLINK_MSG_ID_EXTENDED_SYS_STATE: [self._on_extended_sys_state],
+        }
+
+    async def connect(self, system_address=None):
+        if self.master is not None:
+            return
+        address = system_address or self.address
+        if address.startswith("serial://"):
+            # MAVSDK style serial:///dev/ttyACM0:57600 -> /dev/ttyACM0,57600
+            device, _, baud = address[len("serial://"):].rpartition(":")
+            address = f"{device},{baud}"
+        self.master = mavutil.mavlink_connection(address, source_system=SOURCE_SYSTEM,
+                                                 source_component=SOURCE_COMPONENT)
+        self._heartbeat = asyncio.Event()
+        self._closing.clear()
+        self._receiver = threading.Thread(target=self._receive, args=(asyncio.get_running_loop(), self.master),
+                                          name="mavlink-receiver", daemon=True)
+        self._receiver.start()
+        self._tasks.append(asyncio.create_task(self._send_heartbeats()))
+        print(f"[MAVLINK] Listening on {address}")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.master is not None:
+            self._closing.set()
+            # The thread wakes within RECEIVE_POLL_S; wait for it off the loop
+            await asyncio.get_running_loop().run_in_executor(None, self._receiver.join)
+            self._receiver = None
+            self.master.close()
+            self.master = None
+
+    def boot_ms(self):
+        return int((time.monotonic() - self._t0) * 1000) & 0xFFFFFFFF
+
+    def is_connected(self):
+        return self.last_heartbeat is not None and time.monotonic() - self.last_heartbeat < HEARTBEAT_TIMEOUT_S
+
+    async def _wait_heartbeat(self, timeout):
+        try:
+            await asyncio.wait_for(self._heartbeat.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._heartbeat.clear()
+
+    def add_handler(self, msg_id, handler):
+        """Call handler(msg) for every incoming message with that id."""
+        self._handlers.setdefault(msg_id, []).append(handler)
+
+    def remove_handler(self, msg_id, handler):
+        self._handlers.get(msg_id, []).remove(handler)
+
+    async def wait_message(self, msg_id, predicate=None, timeout_s=None):
+        """Next message with that id (satisfying predicate), or None after timeout_s."""
+        future = asyncio.get_running_loop().create_future()
+
+        def handler(msg):
+            if not future.done() and (predicate is None or predicate(msg)):
+                future.set_result(msg)
+
+        self.add_handler(msg_id, handler)
+        try:
+            return await asyncio.wait_for(future, timeout_s)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.remove_handler(msg_id, handler)
+
+    async def set_mode(self, mode, timeout_s=ACK_TIMEOUT_S):
+        """Switch flight mode by name ("GUIDED", "LAND", ...); returns the MAV_RESULT or None."""
+        return await self.command_long(mavlink.MAV_CMD_DO_SET_MODE, mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                                       self.mode_id(mode), timeout_s=timeout_s)
+
+    def mode_id(self, mode):
+        mapping = self.master.mode_mapping() or {}
+        if mode not in mapping:
+            raise ActionError(_result(ActionResult, "INVALID_ARGUMENT", f"unknown mode {mode}"), "mode")
+        return mapping[mode]
+
+    async def _send_heartbeats(self):
+        while True:
+            self.master.mav.heartbeat_send(mavlink.MAV_TYPE_GCS, mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0)
+            await asyncio.sleep(1.0)
+
+    async def command_long(self, command, *params, timeout_s=ACK_TIMEOUT_S):
+        """Send a COMMAND_LONG and return its MAV_RESULT, or None if no ACK came back in time."""
+        params = (list(params) + [0.0] * 7)[:7]
+        future = asyncio.get_running_loop().create_future()
+        # ACKs carry no sequence number, so same-id commands are answered in order
+        pending = self._acks.setdefault(command, deque())
+        pending.append(future)
+        self.master.mav.command_long_send(self.target_system, self.target_component, command, 0, *params)
+        try:
+            return await asyncio.wait_for(future, timeout_s)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if future in pending:
+                pending.remove(future)
+
+    def _receive(self, loop, master):
+        # Receiver thread: only reads and decodes, handlers run on the loop
+        while not self._closing.is_set():
+            try:
+                msg = master.recv_match(blocking=True, timeout=RECEIVE_POLL_S)
+            except OSError as e:
+                if not self._closing.is_set():
+                    print(f"[MAVLINK] Receive failed: {e}")
+                return
+            if msg is None:
+                continue
+            try:
+                loop.call_soon_threadsafe(self._dispatch, msg)
+            except RuntimeError:
+                # Loop closed under us
+                return
+
+    def _dispatch(self, msg):
+        self.messages += 1
+        for handler in self._handlers.get(msg.get_msgId(), ()):
+            handler(msg)
+
+    def _on_heartbeat(self, msg):
+        # Only the autopilot's heartbeat, not mavproxy's or other GCSs'
+        if msg.type == mavlink.MAV_TYPE_GCS or msg.autopilot == mavlink.MAV_AUTOPILOT_INVALID:
+            return
+        self.target_system = msg.get_srcSystem()
+        self.target_component = msg.get_srcComponent()
+        self.last_heartbeat = time.monotonic()
+        self.mode = mavutil.mode_string_v10(msg)
+        self.armed = bool(msg.base_mode & mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+        self._heartbeat.set()
+        self.telemetry._publish("armed", self.armed)
+
+    def _on_command_ack(self, msg):
+        # IN_PROGRESS is followed by the real result
+        if msg.result == mavlink.MAV_RESULT_IN_PROGRESS:
+            return
+        pending = self._acks.get(msg.command)
+        while pending:
+            future = pending.popleft()
+            if not future.done():
+                future.set_result(msg.result)
+                return
+
+    def _on_local_position_ned(self, msg):
+        self.telemetry._publish("position_velocity_ned", PositionVelocityNed(
+            PositionNed(msg.x, msg.y, msg.z), VelocityNed(msg.vx, msg.vy, msg.vz)))
+
+    def _on_global_position_int(self, msg):
+        self.telemetry._publish("position", Position(msg.lat * 1e-7, msg.lon * 1e-7, msg.alt * 1e-3,
+                                                     msg.relative_alt * 1e-3))
+
+    def _on_attitude(self, msg):
+        self.telemetry._publish("attitude_euler", EulerAngle(math.degrees(msg.roll), math.degrees(msg.pitch),
+                                                             math.degrees(msg.yaw), msg.time_boot_ms * 1000))
+
+    def _on_distance_sensor(self, msg):
+        # The downward rangefinder only (the sonar the scripts read)
+        if msg.orientation != mavlink.MAV_SENSOR_ROTATION_PITCH_270:
+            return
+        self.telemetry._publish("distance_sensor", DistanceSensor(
+            msg.min_distance * 0.01, msg.max_distance * 0.01, msg.current_distance * 0.01, None))
+
+    def _on_extended_sys_state(self, msg):
+        self.telemetry._publish("in_air", msg.landed_state not in (mavlink.MAV_LANDED_STATE_ON_GROUND,
+                                                                    mavlink.MAV_LANDED_STATE_UNDEFINED))
+
+
+def run_script(path, address=DEFAULT_ADDRESS):
+    """Run an unchanged mission script over the direct MAVLink transport."""
+    def make_system(*args, **kwargs):
+        kwargs.setdefault("address", address)
+        return MavlinkSystem(*args, **kwargs)
+    mavsdk.System = make_system
+    sys.argv = [path]
+    runpy.run_path(path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print('Usage: python mavlink_system.py "<mission script>.py" [udp:127.0.0.1:14550]')
+        sys.exit(1)
+    run_script(sys.argv[1], *sys.argv[2:])
@@ -0,0 +1,180 @@
+# mission_plan.py
+
+import json
+import math
+import os
+import sys
+from collections import namedtuple
+from mavsdk.offboard import VelocityNedYaw
+
+ACTIONS = ("waypoint", "checkpoint", "land")
+DEFAULT_SPEED_M_S = 0.5
+DEFAULT_MAX_SPEED_M_S = 1.5
+# Written by velocity_calibration.py; applied to every plan while it exists
+CORRECTION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Missions", "velocity_correction.json")
+
+# Everything the flight loop needs for one leg, precomputed at load time
+CompiledLeg = namedtuple(
+    "CompiledLeg",
+    "index label action north_m east_m distance_m course_deg speed_m_s duration_s "
+    "velocity checkpoint lands command lag_s",
+)
+
+
+class MissionPlan:
+    def __init__(self, name, heading_deg, altitude_m, legs, correction=None):
+        self.name = name
+        self.heading_deg = heading_deg
+        self.altitude_m = altitude_m
+        self.legs = tuple(legs)
+        self.correction = correction
+        self.total_distance_m = sum(leg.distance_m for leg in self.legs)
+        self.total_duration_s = sum(leg.duration_s for leg in self.legs)
+
+    def __iter__(self):
+        return iter(self.legs)
+
+    def __len__(self):
+        return len(self.legs)
+
+    def describe(self):
+        print(f"[PLAN] {self.name}: {len(self.legs)} legs, {self.total_distance_m:.2f} m, "
+              f"~{self.total_duration_s:.0f}s at heading {self.heading_deg:.1f}°")
+        if self.correction is not None:
+            n, e = self.correction["north"], self.correction["east"]
+            print(f"[PLAN] Velocity correction: N gain {n['gain']:.3f} lag {n['lag_s']:.2f}s, "
+                  f"E gain {e['gain']:.3f} lag {e['lag_s']:.2f}s")
+        for leg in self.legs:
+            print(f"  {leg.index:2d} {leg.label:<14} -> N={leg.north_m:6.2f} E={leg.east_m:6.2f}  "
+                  f"{leg.distance_m:5.2f} m @ {leg.speed_m_s:.2f} m/s ({leg.duration_s:4.1f}s) {leg.action}")
+
+
+def load_mission(path):
+    with open(path, "r") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON ({e})")
+
+
+def _number(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{where}: expected a number, got {value!r}")
+    return float(value)
+
+
+def _point(value, where):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{where}: expected [north_m, east_m], got {value!r}")
+    return _number(value[0], where), _number(value[1], where)
+
+
+def load_correction(path=CORRECTION_PATH):
+    """The velocity correction table, or None when there is none."""
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        table = json.load(f)
+    for axis in ("north", "east"):
+        gain = _number(table.get(axis, {}).get("gain"), f"{path}: {axis}.gain")
+        if gain <= 0.0:
+            raise ValueError(f"{path}: {axis}.gain must be positive, got {gain}")
+        _number(table[axis].get("lag_s"), f"{path}: {axis}.lag_s")
+    return table
+
+
+def compile_mission(spec, heading_deg=0.0, correction=None):
+    """
+    Validate a mission spec and turn it into a MissionPlan.
+
+    Waypoints are arena metres (north, east) relative to the first takeoff;
+    heading_deg is the vehicle heading the arena frame is aligned with, so
+    each leg's NED velocity is rotated once here instead of every command.
+
+    velocity is what the leg should achieve; command is the open-loop
+    setpoint that achieves it once each NED axis is divided by the gain
+    from a velocity_calibration.py table, and lag_s is how long the
+    response trails the command.
+    """
+    name = spec.get("name", "mission")
+    default_speed = _number(spec.get("speed_m_s", DEFAULT_SPEED_M_S), f"{name}: speed_m_s")
+    max_speed = _number(spec.get("max_speed_m_s", DEFAULT_MAX_SPEED_M_S), f"{name}: max_speed_m_s")
+    altitude = _number(spec.get("altitude_m", 2.0), f"{name}: altitude_m")
+    north, east = _point(spec.get("start", [0.0, 0.0]), f"{name}: start")
+
+    bounds = spec.get("arena")
+    if bounds is not None:
+        n_min, n_max = _point(bounds.get("north"), f"{name}: arena.north")
+        e_min, e_max = _point(bounds.get("east"), f"{name}: arena.east")
+
+    raw_legs = spec.get("legs")
+    if not raw_legs:
+        raise ValueError(f"{name}: mission has no legs")
+
+    gain_n, gain_e, lag = 1.0, 1.0, 0.0
+    if correction is not None:
+        gain_n, gain_e = correction["north"]["gain"], correction["east"]["gain"]
+        lag = max(correction["north"]["lag_s"], correction["east"]["lag_s"])
+
+    theta = math.radians(heading_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+
+    legs = []
+    checkpoint = 0
+    for index, raw in enumerate(raw_legs, start=1):
+        where = f"{name}: leg {index}"
+        action = raw.get("action", "waypoint")
+        if action not in ACTIONS:
+            raise ValueError(f"{where}: unknown action {action!r}, expected one of {ACTIONS}")
+        to_n, to_e = _point(raw.get("to"), f"{where}: to")
+        if bounds is not None and not (n_min <= to_n <= n_max and e_min <= to_e <= e_max):
+            raise ValueError(f"{where}: waypoint ({to_n}, {to_e}) is outside the arena")
+        speed = _number(raw.get("speed_m_s", default_speed), f"{where}: speed_m_s")
+        if not 0.0 < speed <= max_speed:
+            raise ValueError(f"{where}: speed {speed} m/s outside (0, {max_speed}]")
+
+        dn, de = to_n - north, to_e - east
+        distance = math.hypot(dn, de)
+        if distance == 0.0:
+            raise ValueError(f"{where}: zero-length leg to ({to_n}, {to_e})")
+        vn, ve = dn / distance * speed, de / distance * speed
+        velocity = VelocityNedYaw(vn * cos_t - ve * sin_t, vn * sin_t + ve * cos_t, 0.0, 0.0)
+        command = VelocityNedYaw(velocity.north_m_s / gain_n, velocity.east_m_s / gain_e, 0.0, 0.0)
+        if math.hypot(command.north_m_s, command.east_m_s) > max_speed:
+            raise ValueError(f"{where}: corrected speed {math.hypot(command.north_m_s, command.east_m_s):.2f} "
+                             f"m/s exceeds max_speed_m_s {max_speed}")
+
+        if action != "waypoint":
+            checkpoint += 1
+        label = raw.get("label") or (f"Checkpoint {checkpoint}" if action != "waypoint" else f"Leg {index}")
+        legs.append(CompiledLeg(
+            index=index,
+            label=label,
+            action=action,
+            north_m=to_n,
+            east_m=to_e,
+            distance_m=distance,
+            course_deg=math.degrees(math.atan2(de, dn)) % 360.0,
+            speed_m_s=speed,
+            duration_s=distance / speed,
+            velocity=velocity,
+            checkpoint=checkpoint if action != "waypoint" else 0,
+            lands=action == "land",
+            command=command,
+            lag_s=lag,
+        ))
+        north, east = to_n, to_e
+
+    if not legs[-1].lands:
+        print(f"[PLAN] Warning: {name} does not end with a land leg")
+    return MissionPlan(name, heading_deg, altitude, legs, correction)
+
+
+def load_plan(path, heading_deg=0.0, correction_path=CORRECTION_PATH):
+    return compile_mission(load_mission(path), heading_deg, load_correction(correction_path))
+
+
+if __name__ == "__main__":
+    # Validate and print mission files: python mission_plan.py Missions/*.json
+    for mission_path in sys.argv[1:]:
+        load_plan(mission_path).describe()
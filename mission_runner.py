@@ -0,0 +1,115 @@
+# mission_runner.py
+# Usage: python mission_runner.py Missions/left_start.json [--open]
+#   --open flies each leg as one velocity for a fixed time, like the
+#   Mission_start_* scripts, using the calibrated command from the plan.
+
+import asyncio
+import sys
+from datetime import datetime
+from mavsdk.offboard import VelocityNedYaw, OffboardError
+
+from mav_sdk_controller import connect_drone
+from telemetry_hub import TelemetryHub
+from flight_recorder import FlightRecorder, MARK_TAKEOFF, MARK_CHECKPOINT, MARK_LAND
+from setpoint_streamer import SetpointStreamer
+from motion import move_distance_ned, settle
+from mission_plan import load_plan
+
+LOG_FILE = "flight_log.txt"
+RECORD_FILE = "flight_log.bin"
+
+
+def log_line(text):
+    with open(LOG_FILE, "a") as f:
+        f.write(text + "\n")
+
+
+async def takeoff_and_start_offboard(drone, hub, altitude):
+    print("[ARMING]")
+    await drone.action.arm()
+    await hub.wait_for("armed", bool)
+    print(f"[TAKEOFF] Climbing to {altitude} meter")
+    await drone.action.set_takeoff_altitude(altitude)
+    await drone.action.takeoff()
+    threshold = altitude * 0.9
+    await hub.wait_for("distance_sensor", lambda d: d.current_distance_m >= threshold)
+    print(f"[REACHED] Sonar Altitude: {hub.latest('distance_sensor').current_distance_m:.2f}m")
+
+    await drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, 0.0))
+    await drone.offboard.start()
+    print("[OFFBOARD] Started")
+
+
+async def land(drone, hub):
+    try:
+        await drone.offboard.stop()
+        print("[OFFBOARD] Stopped")
+    except OffboardError as e:
+        print(f"[WARN] Offboard stop failed: {e._result.result}")
+    await drone.action.land()
+    await hub.wait_for("armed", lambda armed: not armed)
+    print("[INFO] Drone disarmed")
+
+
+async def fly(drone, hub, recorder, plan, open_loop=False):
+    airborne = False
+    for leg in plan:
+        print(f"\n==== {leg.label} ====")
+        if not airborne:
+            await takeoff_and_start_offboard(drone, hub, plan.altitude_m)
+            recorder.mark(MARK_TAKEOFF)
+            airborne = True
+        start = (await hub.get("position_velocity_ned")).position
+
+        if open_loop:
+            print(f"[MOVE] {leg.command.north_m_s:.3f}, {leg.command.east_m_s:.3f} m/s for {leg.duration_s:.1f}s")
+            # ArduPilot drops a velocity target after 3 s, so it is streamed for the whole leg
+            async with SetpointStreamer(drone, initial=leg.command) as stream:
+                await asyncio.sleep(leg.duration_s)
+                stream.stop_motion()
+                # The response trails the command by lag_s, so allow it to finish
+                await settle(drone, hub, timeout_s=2.0 + leg.lag_s)
+        else:
+            await move_distance_ned(drone, hub, leg.velocity.north_m_s, leg.velocity.east_m_s, leg.distance_m,
+                                    max_speed=leg.speed_m_s, timeout_s=leg.duration_s * 2 + 5)
+            await settle(drone, hub)
+
+        if leg.checkpoint:
+            log_line(f"CHECKPOINT {leg.checkpoint} REACHED at {datetime.utcnow().isoformat()}")
+            recorder.mark(MARK_CHECKPOINT)
+        if leg.lands:
+            await land(drone, hub)
+            recorder.mark(MARK_LAND)
+            airborne = False
+            end = hub.latest("position_velocity_ned").position
+            log_line(f"LAND (relative): X={end.north_m - start.north_m:.2f} m, "
+                     f"Y={end.east_m - start.east_m:.2f} m, Z={start.down_m - end.down_m:.2f} m "
+                     f"at {datetime.utcnow().isoformat()}")
+    if airborne:
+        await land(drone, hub)
+        recorder.mark(MARK_LAND)
+
+
+async def run(mission_path, open_loop=False):
+    drone = await connect_drone()
+    async with TelemetryHub(drone) as hub:
+        euler = await hub.get("attitude_euler")
+        print(f"[INFO] Initial Heading (Yaw): {euler.yaw_deg:.2f}°")
+        # All heading/length/velocity math happens here, before takeoff
+        plan = load_plan(mission_path, euler.yaw_deg)
+        plan.describe()
+
+        with open(LOG_FILE, "w") as f:
+            f.write(f"=== Mission Log Started at {datetime.utcnow().isoformat()} ===\n")
+
+        async with FlightRecorder(hub, RECORD_FILE) as recorder:
+            await fly(drone, hub, recorder, plan, open_loop)
+    print("[MISSION] Complete")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--open"]
+    if len(args) != 1:
+        print("Usage: python mission_runner.py <mission.json> [--open]")
+        sys.exit(1)
+    asyncio.run(run(args[0], "--open" in sys.argv[1:]))
@@ -0,0 +1,276 @@
+# monte_carlo.py
+# Usage: python monte_carlo.py Missions/left_start.json [Missions/right_start.json ...] [-n 2000] [--open]
+#          [--wind 0.3] [--gust 0.1] [--drift 0.02] [--noise 0.05] [--sonar 0.03] [--arena Missions/arena.json --start N,E]
+#   Flies each mission thousands of times against PointMassModel with random
+#   wind and gusts, EKF drift and sensor noise, on every CPU core, and prints
+#   how far each checkpoint landing ends up from its target and how many legs
+#   ran into their timeout.
+
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from coverage_planner import load_arena
+from mission_plan import load_plan
+from motion import ramp_speed
+from sim_drone import PointMassModel
+
+Noise = namedtuple("Noise", "wind_m_s gust_m_s drift_m_s position_m sonar_m tau_s")
+# Same fields as mavsdk's VelocityNedYaw, without the import in every worker
+_Velocity = namedtuple("_Velocity", "north_m_s east_m_s down_m_s yaw_deg")
+DEFAULT_NOISE = Noise(wind_m_s=0.3, gust_m_s=0.1, drift_m_s=0.02, position_m=0.05, sonar_m=0.03, tau_s=0.1)
+
+PHYSICS_DT = 0.02
+CONTROL_HZ = 20.0  # position_velocity_ned rate the closed loop reacts to
+SETTLE_SPEED_M_S = 0.05
+SETTLE_TIMEOUT_S = 2.0
+TOLERANCE_M = 0.1
+
+
+def _inside(polygon, points):
+    """Even-odd test of (K, 2) points against a polygon, vectorised over points and edges."""
+    p = np.asarray(polygon, dtype=float)
+    n1, e1 = p[:, 0][None, :], p[:, 1][None, :]
+    n2, e2 = np.roll(p[:, 0], -1)[None, :], np.roll(p[:, 1], -1)[None, :]
+    pn, pe = points[:, :1], points[:, 1:]
+    crosses = (n1 > pn) != (n2 > pn)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e_cross = e1 + (pn - n1) * (e2 - e1) / (n2 - n1)
+    return ((crosses & (pe < e_cross)).sum(axis=1) % 2) == 1
+
+
+class _Rollout:
+    """One noisy flight: the model, a drifting position estimate and a sampled trajectory."""
+
+    def __init__(self, plan, noise, seed):
+        rng = np.random.default_rng(seed)
+        self.rng = rng
+        wind_dir = rng.uniform(0.0, 2.0 * math.pi)
+        wind = rng.uniform(0.0, noise.wind_m_s)
+        self.model = PointMassModel(
+            yaw_deg=plan.heading_deg,
+            tau_s=max(0.1, 0.4 + rng.normal(0.0, noise.tau_s)),
+            wind_m_s=(wind * math.cos(wind_dir), wind * math.sin(wind_dir)),
+            gust_m_s=noise.gust_m_s,
+            position_noise_m=noise.position_m,
+            sonar_noise_m=noise.sonar_m,
+            seed=int(rng.integers(1 << 31)),
+        )
+        self.drift_m_s = noise.drift_m_s
+        self.drift = np.zeros(2)
+        self.track = []
+        self._next_control = 0.0
+
+    def estimate(self):
+        n, e, _ = self.model.noisy_position()
+        return n + self.drift[0], e + self.drift[1]
+
+    def step(self):
+        m = self.model
+        m.step(PHYSICS_DT)
+        if m.in_air:
+            # EKF drift: a random walk in the horizontal estimate while flying
+            self.drift += self.rng.normal(0.0, self.drift_m_s * math.sqrt(PHYSICS_DT), 2)
+            self.track.append((m.pos[0], m.pos[1]))
+
+    def control_due(self):
+        if self.model.t + 1e-9 >= self._next_control:
+            self._next_control = self.model.t + 1.0 / CONTROL_HZ
+            return True
+        return False
+
+    def set_velocity(self, vn, ve):
+        m = self.model
+        m.setpoint_kind = "velocity_ned"
+        m.setpoint = _Velocity(vn, ve, 0.0, m.yaw_deg)
+        m.setpoint_t = m.t
+
+
+def _takeoff(r, altitude_m):
+    m = r.model
+    m.armed = True
+    m.takeoff_alt_m = altitude_m
+    m.mode = "takeoff"
+    while m.sonar_m() < altitude_m * 0.9:
+        r.step()
+    r.set_velocity(0.0, 0.0)
+    m.mode = "offboard"
+
+
+def _fly_open(r, leg):
+    # The hand-tuned scripts: one velocity for a fixed time, streamed as mission_runner --open does
+    end = r.model.t + leg.duration_s
+    while r.model.t < end:
+        if r.control_due():
+            r.set_velocity(leg.velocity.north_m_s, leg.velocity.east_m_s)
+        r.step()
+
+
+def _fly_closed(r, leg, timeout_s):
+    # mission_runner: move_distance_ned from the current estimate, ramped down near the target.
+    # Returns False when the leg ran into its timeout
+    speed = math.hypot(leg.velocity.north_m_s, leg.velocity.east_m_s)
+    n0, e0 = r.estimate()
+    tn = n0 + leg.velocity.north_m_s / speed * leg.distance_m
+    te = e0 + leg.velocity.east_m_s / speed * leg.distance_m
+    end = r.model.t + timeout_s
+    while r.model.t < end:
+        if r.control_due():
+            n, e = r.estimate()
+            dn, de = tn - n, te - e
+            remaining = math.hypot(dn, de)
+            if remaining <= TOLERANCE_M:
+                return True
+            v = ramp_speed(remaining, speed)
+            r.set_velocity(dn / remaining * v, de / remaining * v)
+        r.step()
+    return False
+
+
+def _settle(r):
+    r.set_velocity(0.0, 0.0)
+    end = r.model.t + SETTLE_TIMEOUT_S
+    while r.model.t < end and math.hypot(r.model.vel[0], r.model.vel[1]) >= SETTLE_SPEED_M_S:
+        r.step()
+
+
+def _land(r):
+    m = r.model
+    m.mode = "land"
+    while m.armed:
+        r.step()
+
+
+def rollout(plan, noise, seed, closed_loop=True):
+    """
+    Fly the plan once. Returns (landing points (K, 2) in the arena frame,
+    total time, (T, 2) in-air track in the arena frame, legs that timed out).
+    """
+    r = _Rollout(plan, noise, seed)
+    theta = math.radians(plan.heading_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    landings = []
+    timeouts = 0
+    airborne = False
+    for leg in plan:
+        if not airborne:
+            _takeoff(r, plan.altitude_m)
+            airborne = True
+        if closed_loop:
+            timeouts += not _fly_closed(r, leg, leg.duration_s * 2 + 5)
+        else:
+            _fly_open(r, leg)
+        _settle(r)
+        if leg.lands:
+            _land(r)
+            airborne = False
+            n, e = r.model.pos[0], r.model.pos[1]
+            # NED back to the arena frame the plan's waypoints are in
+            landings.append((n * cos_t + e * sin_t, -n * sin_t + e * cos_t))
+    if airborne:
+        _land(r)
+    track = np.asarray(r.track, dtype=float).reshape(-1, 2)
+    track = np.column_stack([track[:, 0] * cos_t + track[:, 1] * sin_t, -track[:, 0] * sin_t + track[:, 1] * cos_t])
+    return np.asarray(landings, dtype=float).reshape(-1, 2), r.model.t, track, timeouts
+
+
+def run_batch(path, seeds, noise=DEFAULT_NOISE, closed_loop=True, arena=None, start=(0.0, 0.0)):
+    """
+    A chunk of rollouts in one process. Returns per-rollout arrays:
+    checkpoint errors (R, K), landing points (R, K, 2), time (R,),
+    seconds outside the arena (R,), legs that hit their timeout (R,).
+    """
+    plan = load_plan(path)
+    targets = np.array([(leg.north_m, leg.east_m) for leg in plan if leg.lands])
+    k = len(targets)
+    points = np.full((len(seeds), k, 2), np.nan)
+    times = np.empty(len(seeds))
+    outside_s = np.zeros(len(seeds))
+    timeouts = np.zeros(len(seeds), dtype=int)
+    for i, seed in enumerate(seeds):
+        landings, t, track, timeouts[i] = rollout(plan, noise, seed, closed_loop)
+        points[i, :len(landings)] = landings[:k]
+        times[i] = t
+        if arena is not None and len(track):
+            outside_s[i] = (~_inside(arena, track + np.asarray(start))).sum() * PHYSICS_DT
+    errors = np.hypot(*(points - targets[None]).transpose(2, 0, 1))
+    return errors, points, times, outside_s, timeouts
+
+
+def evaluate(path, n=1000, noise=DEFAULT_NOISE, closed_loop=True, arena=None, start=(0.0, 0.0), seed=0,
+             workers=None, chunk=50):
+    """run_batch over n rollouts split across a process pool, concatenated."""
+    seeds = np.arange(seed, seed + n)
+    chunks = [seeds[i:i + chunk].tolist() for i in range(0, n, chunk)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_batch, path, c, noise, closed_loop, arena, start) for c in chunks]
+        parts = [f.result() for f in futures]
+    return tuple(np.concatenate([p[i] for p in parts]) for i in range(5))
+
+
+def summarize(path, errors, times, outside_s, timeouts, labels):
+    print(f"[MC] {path}: {len(times)} rollouts, time {times.mean():.1f}s mean / "
+          f"{np.percentile(times, 95):.1f}s p95")
+    for j, label in enumerate(labels):
+        e = errors[:, j]
+        print(f"  {label:<14} error {np.nanmean(e):.2f} m mean, {np.nanpercentile(e, 50):.2f} p50, "
+              f"{np.nanpercentile(e, 95):.2f} p95, {np.nanmax(e):.2f} max; "
+              f"{np.mean(e <= 0.5) * 100:.0f}% within 0.5 m")
+    if timeouts.any():
+        print(f"  Timeouts: {np.mean(timeouts > 0) * 100:.1f}% of rollouts had a leg hit its timeout, "
+              f"{timeouts.sum()} legs in total; their landing errors are included above")
+    if outside_s.any():
+        print(f"  Border: {np.mean(outside_s > 0) * 100:.1f}% of rollouts leave the arena, "
+              f"{outside_s[outside_s > 0].mean():.1f}s outside when they do")
+
+
+def _parse_args(args):
+    options = {"n": 1000, "closed_loop": True, "noise": DEFAULT_NOISE._asdict(), "arena": None,
+               "start": (0.0, 0.0)}
+    flags = {"--wind": "wind_m_s", "--gust": "gust_m_s", "--drift": "drift_m_s", "--noise": "position_m", "--sonar": "sonar_m"}
+    paths = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "-n":
+            options["n"] = int(args[i + 1])
+            i += 1
+        elif arg == "--open":
+            options["closed_loop"] = False
+        elif arg in flags:
+            options["noise"][flags[arg]] = float(args[i + 1])
+            i += 1
+        elif arg == "--arena":
+            options["arena"] = load_arena(args[i + 1])
+            i += 1
+        elif arg == "--start":
+            options["start"] = tuple(float(x) for x in args[i + 1].split(","))
+            i += 1
+        else:
+            paths.append(arg)
+        i += 1
+    options["noise"] = Noise(**options["noise"])
+    return paths, options
+
+
+if __name__ == "__main__":
+    paths, options = _parse_args(sys.argv[1:])
+    if not paths:
+        print("Usage: python monte_carlo.py <mission.json> [...] [-n N] [--open] [--wind m/s] [--gust m/s] "
+              "[--drift m/s] [--noise m] [--sonar m] [--arena Missions/arena.json --start N,E]")
+        sys.exit(1)
+    print(f"[MC] {options['noise']}, {'closed' if options['closed_loop'] else 'open'} loop, "
+          f"{os.cpu_count()} processes")
+    for path in paths:
+        plan = load_plan(path)
+        labels = [leg.label for leg in plan if leg.lands]
+        t0 = time.perf_counter()
+        errors, _, times, outside_s, timeouts = evaluate(path, options["n"], options["noise"], options["closed_loop"],
+                                               options["arena"], options["start"])
+        elapsed = time.perf_counter() - t0
+        summarize(path, errors, times, outside_s, timeouts, labels)
+        print(f"[MC] {options['n']} rollouts in {elapsed:.1f}s ({options['n'] / elapsed:.0f}/s)")
@@ -0,0 +1,95 @@
+# motion.py
+
+import asyncio
+import math
+from collections import namedtuple
+from mavsdk.offboard import VelocityNedYaw
+
+MoveResult = namedtuple("MoveResult", "reached error_m travelled_m elapsed_s")
+
+STOP = VelocityNedYaw(0.0, 0.0, 0.0, 0.0)
+
+
+def ramp_speed(remaining_m, max_speed, decel=0.5, min_speed=0.05, gain=1.0):
+    """
+    Speed to command with remaining_m left: capped by the braking curve
+    sqrt(2 * decel * d) and a proportional term, never below min_speed so
+    the last centimetres are still closed.
+    """
+    speed = min(max_speed, math.sqrt(2.0 * decel * remaining_m), gain * remaining_m)
+    return max(speed, min_speed)
+
+
+async def move_to_position_ned(drone, hub, north_m, east_m, max_speed=0.5, tolerance_m=0.1,
+                               timeout_s=30, decel=0.5, min_speed=0.05, yaw_deg=0.0):
+    """
+    Fly to a local NED point. A new velocity setpoint is computed on every
+    position_velocity_ned update, pointing at the target and ramped down
+    near it, and the move returns as soon as the target is inside
+    tolerance_m. Altitude is left to the autopilot.
+    """
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    deadline = start_time + timeout_s
+    pv = await hub.get("position_velocity_ned")
+    n0, e0 = pv.position.north_m, pv.position.east_m
+    print(f"[MOVE] To N={north_m:.2f} E={east_m:.2f} (max {max_speed:.2f} m/s)")
+
+    while True:
+        dn = north_m - pv.position.north_m
+        de = east_m - pv.position.east_m
+        remaining = math.hypot(dn, de)
+        travelled = math.hypot(pv.position.north_m - n0, pv.position.east_m - e0)
+        if remaining <= tolerance_m:
+            await drone.offboard.set_velocity_ned(STOP)
+            elapsed = loop.time() - start_time
+            print(f"[REACHED] {travelled:.2f} m in {elapsed:.1f}s, error {remaining:.2f} m")
+            return MoveResult(True, remaining, travelled, elapsed)
+
+        speed = ramp_speed(remaining, max_speed, decel, min_speed)
+        await drone.offboard.set_velocity_ned(
+            VelocityNedYaw(dn / remaining * speed, de / remaining * speed, 0.0, yaw_deg))
+
+        try:
+            pv = await hub.next("position_velocity_ned", timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            await drone.offboard.set_velocity_ned(STOP)
+            elapsed = loop.time() - start_time
+            print(f"[TIMEOUT] Stopped {remaining:.2f} m short after {elapsed:.1f}s")
+            return MoveResult(False, remaining, travelled, elapsed)
+
+
+async def move_distance_ned(drone, hub, vx, vy, distance_m, **kwargs):
+    """
+    Travel distance_m along the direction of (vx, vy) from where the drone
+    is now, using |(vx, vy)| as the cruise speed.
+    """
+    speed = math.hypot(vx, vy)
+    if speed == 0.0 or distance_m <= 0.0:
+        return MoveResult(True, 0.0, 0.0, 0.0)
+    pv = await hub.get("position_velocity_ned")
+    north = pv.position.north_m + vx / speed * distance_m
+    east = pv.position.east_m + vy / speed * distance_m
+    kwargs.setdefault("max_speed", speed)
+    return await move_to_position_ned(drone, hub, north, east, **kwargs)
+
+
+async def settle(drone, hub, speed_m_s=0.05, timeout_s=2.0):
+    """
+    Hold zero velocity until measured ground speed drops below speed_m_s,
+    instead of a fixed hold() sleep. Returns the time it took.
+    """
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    await drone.offboard.set_velocity_ned(STOP)
+    try:
+        await hub.wait_for(
+            "position_velocity_ned",
+            lambda pv: math.hypot(pv.velocity.north_m_s, pv.velocity.east_m_s) < speed_m_s,
+            timeout=timeout_s,
+        )
+    except asyncio.TimeoutError:
+        print(f"[SETTLE] Still moving after {timeout_s:.1f}s")
+    elapsed = loop.time() - start_time
+    print(f"[SETTLE] Settled in {elapsed:.2f}s")
+    return elapsed
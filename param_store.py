@@ -0,0 +1,204 @@
+# param_store.py
+# Usage:
+#   python param_store.py                  N-way diff matrix of every file in Param Files/
+#   python param_store.py RNGFND1_ EK3_    those parameters across every file
+#   python param_store.py new.param        a new dump against the whole history
+
+import bisect
+import glob
+import os
+import sys
+import numpy as np
+
+from log_ingest import file_sha1
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PARAM_DIR = os.path.join(ROOT, "Param Files")
+CACHE_DIR = os.path.join(ROOT, ".param_cache")
+CACHE_VERSION = 1
+PARAM_PATTERNS = ("*.param", "*.parm")
+
+
+def parse_param_file(path):
+    """
+    (names, values) from a Mission Planner "NAME,value" dump or a
+    MAVProxy "NAME   value" dump. Comments and blank lines are skipped.
+    """
+    names, values = [], []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.replace(",", " ").split()
+            if len(parts) < 2:
+                continue
+            try:
+                value = float(parts[1])
+            except ValueError:
+                continue
+            names.append(parts[0])
+            values.append(value)
+    return np.array(names), np.array(values, dtype=np.float64)
+
+
+def load_param_file(path, cache_dir=CACHE_DIR, use_cache=True):
+    """parse_param_file, reusing the .npz cached under the file's SHA-1."""
+    sha1 = file_sha1(path)
+    cache_path = os.path.join(cache_dir, f"{sha1}.v{CACHE_VERSION}.npz")
+    if use_cache and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return cached["names"], cached["values"]
+
+    names, values = parse_param_file(path)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, names=names, values=values)
+        os.replace(tmp_path, cache_path)
+    return names, values
+
+
+def _same(a, b):
+    # Missing (NaN) only matches missing; float32 round-trip noise is not a change
+    both_missing = np.isnan(a) & np.isnan(b)
+    return both_missing | np.isclose(a, b, rtol=1e-6, atol=1e-7)
+
+
+class ParamStore:
+    """
+    Columnar store of several parameter files.
+
+    names is the sorted union of every parameter name, values is a
+    (len(names), len(files)) float64 matrix with NaN where a file does not
+    have the parameter. index maps a name to its row, so lookups are a
+    dict hit; prefix queries bisect the sorted names.
+    """
+
+    def __init__(self, files, names, values):
+        self.files = list(files)
+        self.names = names
+        self.values = values
+        self.index = {name: row for row, name in enumerate(names.tolist())}
+        self._file_index = {label: col for col, label in enumerate(self.files)}
+        self._sorted_names = names.tolist()
+
+    def _col(self, file):
+        return file if isinstance(file, int) else self._file_index[file]
+
+    def get(self, name, file=None):
+        """One value (NaN if missing), or the row across every file if file is None."""
+        row = self.index.get(name)
+        if row is None:
+            return np.nan if file is not None else np.full(len(self.files), np.nan)
+        if file is None:
+            return self.values[row]
+        return self.values[row, self._col(file)]
+
+    def column(self, file):
+        """{name: value} of one file, without its missing parameters."""
+        col = self.values[:, self._col(file)]
+        present = ~np.isnan(col)
+        return dict(zip(self.names[present].tolist(), col[present].tolist()))
+
+    def prefix(self, prefix):
+        """Row numbers of every parameter starting with prefix, e.g. "RNGFND1_"."""
+        lo = bisect.bisect_left(self._sorted_names, prefix)
+        hi = bisect.bisect_left(self._sorted_names, prefix + "\uffff")
+        return np.arange(lo, hi)
+
+    def diff_matrix(self):
+        """(F, F) matrix with the number of parameters that differ between each pair of files."""
+        v = self.values
+        same = _same(v[:, :, None], v[:, None, :])
+        return (~same).sum(axis=0)
+
+    def changed(self, a, b):
+        """[(name, value_a, value_b)] for every parameter that differs between two files."""
+        va, vb = self.values[:, self._col(a)], self.values[:, self._col(b)]
+        rows = np.flatnonzero(~_same(va, vb))
+        return [(self.names[r], va[r], vb[r]) for r in rows]
+
+    def compare(self, names, values):
+        """
+        One dump against every stored file: (differing entries per file,
+        the dump as a column aligned to the store's rows, names the store
+        has never seen).
+        """
+        col = np.full(len(self.names), np.nan)
+        rows = np.array([self.index.get(n, -1) for n in np.asarray(names).tolist()], dtype=np.intp)
+        known = rows >= 0
+        col[rows[known]] = np.asarray(values)[known]
+        counts = (~_same(self.values, col[:, None])).sum(axis=0)
+        extra = np.asarray(names)[~known].tolist()
+        return counts, col, extra
+
+
+def build_store(paths, cache_dir=CACHE_DIR, use_cache=True):
+    loaded = [load_param_file(path, cache_dir, use_cache) for path in paths]
+    names = np.unique(np.concatenate([n for n, _ in loaded])) if loaded else np.array([], dtype=str)
+    index = {name: row for row, name in enumerate(names.tolist())}
+    values = np.full((len(names), len(loaded)), np.nan)
+    for col, (file_names, file_values) in enumerate(loaded):
+        rows = np.fromiter((index[n] for n in file_names.tolist()), dtype=np.intp, count=len(file_names))
+        values[rows, col] = file_values
+    labels = [os.path.basename(path) for path in paths]
+    return ParamStore(labels, names, values)
+
+
+def param_files(directory=PARAM_DIR):
+    paths = []
+    for pattern in PARAM_PATTERNS:
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
+
+
+def load_store(directory=PARAM_DIR, cache_dir=CACHE_DIR, use_cache=True):
+    return build_store(param_files(directory), cache_dir, use_cache)
+
+
+def _fmt(value):
+    return "-" if np.isnan(value) else f"{value:g}"
+
+
+def print_matrix(store):
+    matrix = store.diff_matrix()
+    width = max(len(label) for label in store.files)
+    print(f"[PARAM] {len(store.names)} parameters in {len(store.files)} files, differing entries:")
+    for i, label in enumerate(store.files):
+        row = " ".join(f"{int(n):5d}" for n in matrix[i])
+        print(f"  {i:2d} {label:<{width}} {row}")
+
+
+def print_prefix(store, prefix):
+    for row in store.prefix(prefix):
+        cells = " ".join(f"{_fmt(v):>10}" for v in store.values[row])
+        print(f"  {store.names[row]:<18} {cells}")
+
+
+def print_compare(store, path):
+    names, values = load_param_file(path)
+    counts, col, extra = store.compare(names, values)
+    print(f"[PARAM] {os.path.basename(path)}: {len(names)} parameters")
+    for label, count in sorted(zip(store.files, counts.tolist()), key=lambda x: x[1]):
+        print(f"  {count:5d} differences vs {label}")
+    closest = store.files[int(np.argmin(counts))]
+    print(f"[PARAM] Closest: {closest}")
+    c = store._col(closest)
+    for r in np.flatnonzero(~_same(store.values[:, c], col)):
+        print(f"  {store.names[r]:<18} {_fmt(store.values[r, c]):>10} -> {_fmt(col[r])}")
+    for name in extra:
+        print(f"  {name:<18} {'(new)':>10}")
+
+
+if __name__ == "__main__":
+    store = load_store()
+    args = sys.argv[1:]
+    if not args:
+        print_matrix(store)
+    for arg in args:
+        if os.path.isfile(arg):
+            print_compare(store, arg)
+        else:
+            print(f"[PARAM] {arg}* across: " + ", ".join(f"{i}={label}" for i, label in enumerate(store.files)))
+            print_prefix(store, arg)
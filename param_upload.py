@@ -0,0 +1,159 @@
+# param_upload.py
+# Push a parameter file to the vehicle, sending only what differs, then verify.
+# Usage: python param_upload.py "Param Files/Best.param" [NAME=value ...] [--dry-run]
+#   NAME=value entries override the file, e.g. RNGFND1_TYPE=1 EK3_ALT_SOURCE=1 (Notes.txt)
+
+import asyncio
+import math
+import sys
+from collections import namedtuple
+import numpy as np
+from mavsdk.param import ParamError
+
+from mav_sdk_controller import connect_drone
+from param_store import load_param_file
+
+ParamChange = namedtuple("ParamChange", "name old new is_int")
+
+# Counters the autopilot keeps itself (boot count, flight time); never pushed
+SKIP_PREFIXES = ("STAT_",)
+
+
+async def fetch_params(drone):
+    """{name: (value, is_int)} of every parameter on the vehicle, in one request."""
+    all_params = await drone.param.get_all_params()
+    params = {p.name: (float(p.value), True) for p in all_params.int_params}
+    params.update({p.name: (float(p.value), False) for p in all_params.float_params})
+    return params
+
+
+def plan_upload(names, values, current):
+    """
+    Changes needed to bring current (from fetch_params) to the file's
+    values, and the file's names the vehicle does not have.
+    """
+    changes, unknown = [], []
+    for name, value in zip(names, values):
+        if name.startswith(SKIP_PREFIXES):
+            continue
+        if name not in current:
+            unknown.append(name)
+            continue
+        old, is_int = current[name]
+        # Same tolerance as the store's diff: float32 noise is not a change
+        if not np.isclose(old, value, rtol=1e-6, atol=1e-7):
+            changes.append(ParamChange(name, old, float(value), is_int))
+    return changes, unknown
+
+
+async def _set(drone, change):
+    if change.is_int:
+        await drone.param.set_param_int(change.name, int(round(change.new)))
+    else:
+        await drone.param.set_param_float(change.name, change.new)
+
+
+async def upload(drone, changes, concurrency=8):
+    """
+    Send every change with at most concurrency requests in flight.
+    Returns [(change, error)] for the ones the vehicle rejected or that
+    failed on the way (gRPC or connection errors); the rest of the batch
+    is still sent.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = []
+
+    async def send(change):
+        async with semaphore:
+            try:
+                await _set(drone, change)
+            except ParamError as e:
+                failures.append((change, e._result.result))
+            except Exception as e:
+                failures.append((change, f"{type(e).__name__}: {e}"))
+
+    await asyncio.gather(*(send(change) for change in changes))
+    return failures
+
+
+async def verify(drone, changes):
+    """Read everything back in one batch; returns the changes that did not stick."""
+    current = await fetch_params(drone)
+    mismatched = []
+    for change in changes:
+        value, _ = current.get(change.name, (np.nan, change.is_int))
+        if not np.isclose(value, change.new, rtol=1e-6, atol=1e-7):
+            mismatched.append(change._replace(old=value))
+    return mismatched
+
+
+def parse_overrides(args):
+    """{NAME: value} from NAME=value arguments; ValueError names the bad one."""
+    overrides = {}
+    for arg in args:
+        name, sep, value = arg.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"{arg!r}: expected NAME=value")
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{arg!r}: {value.strip()!r} is not a number")
+        if not math.isfinite(number):
+            raise ValueError(f"{arg!r}: value must be finite")
+        overrides[name] = number
+    return overrides
+
+
+async def run(path, overrides=None, dry_run=False, concurrency=8):
+    names, values = load_param_file(path)
+    names, values = names.tolist(), values.tolist()
+    if overrides:
+        merged = dict(zip(names, values))
+        merged.update(overrides)
+        names, values = list(merged), list(merged.values())
+
+    # Parameters only, no telemetry rates to set up
+    drone = await connect_drone(rates=None)
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    current = await fetch_params(drone)
+    print(f"[PARAM] Vehicle has {len(current)} parameters ({loop.time() - start:.1f}s)")
+
+    changes, unknown = plan_upload(names, values, current)
+    print(f"[PARAM] {path}: {len(names)} entries, {len(changes)} differ, {len(unknown)} unknown to the vehicle")
+    for change in changes:
+        print(f"  {change.name:<18} {change.old:g} -> {change.new:g}")
+    for name in unknown:
+        print(f"  {name:<18} (not on vehicle, skipped)")
+    if dry_run or not changes:
+        return
+
+    start = loop.time()
+    failures = await upload(drone, changes, concurrency)
+    print(f"[PARAM] Sent {len(changes) - len(failures)}/{len(changes)} in {loop.time() - start:.1f}s")
+    for change, result in failures:
+        print(f"[ERROR] {change.name}: {result}")
+
+    mismatched = await verify(drone, changes)
+    if mismatched:
+        for change in mismatched:
+            print(f"[VERIFY] {change.name} reads back {change.old:g}, expected {change.new:g}")
+    else:
+        print("[VERIFY] All changes read back correctly")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    args = [a for a in args if a != "--dry-run"]
+    if not args:
+        print('Usage: python param_upload.py "<file>.param" [NAME=value ...] [--dry-run]')
+        sys.exit(1)
+    try:
+        overrides = parse_overrides(args[1:])
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        print('Usage: python param_upload.py "<file>.param" [NAME=value ...] [--dry-run]')
+        sys.exit(1)
+    asyncio.run(run(args[0], overrides, dry_run))
@@ -0,0 +1,107 @@
+# position_source.py
+
+import asyncio
+import math
+from collections import namedtuple
+import numpy as np
+
+EARTH_RADIUS_M = 6378137.0
+
+# A position and the frame it was read in ("ned" or "global")
+Fix = namedtuple("Fix", "north_m east_m down_m source")
+
+
+class LocalProjection:
+    """
+    Equirectangular lat/lon -> local north/east metres around a fixed
+    origin. The metres-per-degree factors are computed once, so every
+    projection is a subtraction and a multiply, for scalars or arrays.
+    """
+
+    def __init__(self, origin_lat_deg, origin_lon_deg, origin_alt_m=0.0):
+        self.origin_lat_deg = origin_lat_deg
+        self.origin_lon_deg = origin_lon_deg
+        self.origin_alt_m = origin_alt_m
+        self.m_per_deg_lat = math.radians(1.0) * EARTH_RADIUS_M
+        self.m_per_deg_lon = self.m_per_deg_lat * math.cos(math.radians(origin_lat_deg))
+
+    def to_ned(self, lat_deg, lon_deg, alt_m):
+        north = (lat_deg - self.origin_lat_deg) * self.m_per_deg_lat
+        east = (lon_deg - self.origin_lon_deg) * self.m_per_deg_lon
+        return north, east, self.origin_alt_m - alt_m
+
+    def to_ned_batch(self, lat_deg, lon_deg, alt_m):
+        """Vectorised to_ned for arrays of samples; returns an (N, 3) array."""
+        out = np.empty((np.shape(lat_deg)[0], 3))
+        out[:, 0] = (np.asarray(lat_deg) - self.origin_lat_deg) * self.m_per_deg_lat
+        out[:, 1] = (np.asarray(lon_deg) - self.origin_lon_deg) * self.m_per_deg_lon
+        out[:, 2] = self.origin_alt_m - np.asarray(alt_m)
+        return out
+
+
+class PositionSource:
+    """
+    Local NED position from the telemetry hub.
+
+    Uses position_velocity_ned (the frame the autopilot itself flies in)
+    when a fresh sample exists at the first read, and otherwise projects
+    telemetry.position() around the first lat/lon it saw. The two frames
+    have different origins, so the first read pins the source and every
+    later read stays on it; source tells which one that is.
+    """
+
+    def __init__(self, hub, max_age_s=0.5, projection=None):
+        self.hub = hub
+        self.max_age_s = max_age_s
+        self.projection = projection
+        self.source = None
+
+    def _from_ned(self):
+        if self.hub.age("position_velocity_ned") > self.max_age_s:
+            if self.source != "ned" or self.hub.latest("position_velocity_ned") is None:
+                return None
+            # Pinned: an old sample in the right frame beats a fresh one in the wrong frame
+            print(f"[POSITION] position_velocity_ned is {self.hub.age('position_velocity_ned'):.1f}s old")
+        p = self.hub.latest("position_velocity_ned").position
+        self.source = "ned"
+        return Fix(p.north_m, p.east_m, p.down_m, "ned")
+
+    def _from_global(self):
+        pos = self.hub.latest("position")
+        if pos is None:
+            return None
+        if self.projection is None:
+            self.projection = LocalProjection(pos.latitude_deg, pos.longitude_deg, pos.relative_altitude_m)
+            print("[POSITION] No local NED stream, projecting lat/lon around the first fix")
+        self.source = "global"
+        return Fix(*self.projection.to_ned(pos.latitude_deg, pos.longitude_deg, pos.relative_altitude_m), "global")
+
+    def latest(self):
+        """Fix (north, east, down in metres, source), or None before any position arrives."""
+        if self.source == "global":
+            return self._from_global()
+        ned = self._from_ned()
+        if ned is None and self.source is None:
+            ned = self._from_global()
+        return ned
+
+    async def get(self, timeout=5.0):
+        """Like latest(), waiting up to timeout for the first usable sample."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            ned = self.latest()
+            if ned is not None:
+                return ned
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("no position_velocity_ned or position sample")
+            # Only until the first fix arrives on either stream
+            await asyncio.sleep(min(remaining, 0.05))
+
+    @staticmethod
+    def displacement(start, end):
+        """(X north, Y east, Z up) from start to end, as written in the flight logs."""
+        if start.source != end.source:
+            raise ValueError(f"displacement between a {start.source} and a {end.source} position")
+        return end[0] - start[0], end[1] - start[1], start[2] - end[2]
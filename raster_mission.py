@@ -0,0 +1,187 @@
+# raster_mission.py
+
+import asyncio
+
+# Mission states
+TAKEOFF = "takeoff"
+LANE = "lane"
+SIDE_STEP = "side_step"
+HOLD = "hold"
+LAND = "land"
+RETAKEOFF = "retakeoff"
+DONE = "done"
+
+SPEED_M_S = 0.3
+RIGHT_STEP_M = 1.5  # 5 s at 0.3 m/s
+HOLD_S = 1.0
+LANDINGS = 3
+
+
+class RasterMission:
+    """
+    The raster search as explicit states.
+
+    Each state is a coroutine that returns the next state. Legs end on the
+    first of their own condition (a timer, a telemetry predicate) or a
+    command from the channel, awaited together with asyncio.wait, so a
+    LAND or YELLOW cuts a leg short the moment it arrives.
+    """
+
+    def __init__(self, drone, hub, frame, commands, setpoints, border=None, coverage=None, arena=None,
+                 altitude_m=3.0, landings=LANDINGS):
+        self.drone = drone
+        self.hub = hub
+        self.frame = frame
+        self.commands = commands
+        self.setpoints = setpoints
+        self.border = border
+        self.coverage = coverage
+        self.altitude_m = altitude_m
+        self.landings = landings
+        self.state = TAKEOFF
+        self.direction = 1  # +1 forward, -1 backward along the lanes
+        self.land_count = 0
+        self._after_hold = LANE
+        self._pending = None
+        if arena is not None:
+            self.lane_north = (arena.outline[:, 0].min(), arena.outline[:, 0].max())
+            self.east_limit = arena.outline[:, 1].max()
+        self._handlers = {
+            TAKEOFF: self._takeoff,
+            LANE: self._lane,
+            SIDE_STEP: self._side_step,
+            HOLD: self._hold,
+            LAND: self._land,
+            RETAKEOFF: self._retakeoff,
+        }
+
+    async def run(self):
+        try:
+            while self.state != DONE:
+                next_state = await self._handlers[self.state]()
+                print(f"[STATE] {self.state} -> {next_state}")
+                self.state = next_state
+        finally:
+            if self._pending is not None:
+                self._pending.cancel()
+                await asyncio.gather(self._pending, return_exceptions=True)
+                self._pending = None
+        print(f"[MISSION] Land command triggered {self.land_count} times. Ending mission.")
+
+    async def _command(self, timeout=None):
+        """Next LAND/YELLOW from the channel, or None if timeout passes first."""
+        if self._pending is None:
+            self._pending = asyncio.create_task(self.commands.next_command())
+        done, _ = await asyncio.wait({self._pending}, timeout=timeout)
+        if not done:
+            return None
+        command, self._pending = self._pending.result(), None
+        print(f"[COMMAND] {command} signal received!")
+        return command
+
+    async def _fly_up(self):
+        if self.hub.latest("armed"):
+            print("[WARNING] Drone is already armed. Skipping takeoff.")
+        else:
+            print("[ARMING]")
+            await self.drone.action.arm()
+            await self.hub.wait_for("armed", bool)
+            print(f"[TAKEOFF] Climbing to {self.altitude_m} meter")
+            await self.drone.action.set_takeoff_altitude(self.altitude_m)
+            await self.drone.action.takeoff()
+            threshold = self.altitude_m * 0.9
+            print(f"[WAIT] Waiting for sonar to reach at least {threshold:.2f}m")
+            sample = await self.hub.wait_for("distance_sensor", lambda d: d.current_distance_m >= threshold)
+            print(f"[REACHED] Sonar Altitude: {sample.current_distance_m:.2f}m")
+
+        self.setpoints.stop_motion()
+        await self.setpoints.start()
+        await self.drone.offboard.start()
+        print("[OFFBOARD] Started")
+
+    async def _takeoff(self):
+        await self._fly_up()
+        return LANE
+
+    async def _lane(self):
+        # A lane has no end of its own: the border (YELLOW) or LAND ends it
+        print("[MOVE] Moving forward" if self.direction > 0 else "[MOVE] Moving backward")
+        self.setpoints.set_velocity_ned(self.frame.velocity(self.direction * SPEED_M_S, 0.0))
+        command = await self._command()
+        if command == "LAND":
+            return LAND
+        if self.coverage is not None:
+            print(f"[COVERAGE] {self.coverage.percent():.1f}% of the arena covered")
+        return self._hold_then(SIDE_STEP)
+
+    def _hold_then(self, state):
+        self._after_hold = state
+        return HOLD
+
+    async def _hold(self):
+        print(f"[HOLD] Holding position for {HOLD_S:.0f}s")
+        self.setpoints.stop_motion()
+        loop = asyncio.get_running_loop()
+        end = loop.time() + HOLD_S
+        while True:
+            command = await self._command(max(0.0, end - loop.time()))
+            if command is None:
+                return self._after_hold
+            if command == "LAND":
+                return LAND
+            print("[HOLD] YELLOW ignored while holding")
+
+    def _side_step_duration(self):
+        # Step over lanes the footprint has already swept
+        steps = 1
+        if self.coverage is not None and self.border is not None and self.border.position is not None:
+            east = self.border.position[1]
+            while steps < 3 and east + (steps + 1) * RIGHT_STEP_M < self.east_limit:
+                lane_east = east + steps * RIGHT_STEP_M
+                if not self.coverage.is_redundant((self.lane_north[0], lane_east), (self.lane_north[1], lane_east)):
+                    break
+                steps += 1
+            if steps > 1:
+                print(f"[COVERAGE] Skipping {steps - 1} lane(s) already covered")
+        return steps * RIGHT_STEP_M / SPEED_M_S
+
+    async def _side_step(self):
+        duration = self._side_step_duration()
+        print(f"[MOVE] Moving right for {duration:.0f}s")
+        self.setpoints.set_velocity_ned(self.frame.velocity(0.0, SPEED_M_S))
+        self.direction = -self.direction
+        command = await self._command(duration)
+        if command == "LAND":
+            return LAND
+        if command == "YELLOW":
+            print("[COMMAND] YELLOW pressed during right movement - cancelling right move")
+            self.setpoints.stop_motion()
+        else:
+            print("[MOVE] Completed right movement")
+        return self._hold_then(LANE)
+
+    async def _land(self):
+        await self.setpoints.stop()
+        try:
+            await self.drone.offboard.stop()
+            print("[OFFBOARD] Stopped before landing.")
+        except Exception as e:
+            print(f"[OFFBOARD] Already stopped or failed to stop: {e}")
+        await self.drone.action.land()
+        print("[WAIT] Waiting for drone to disarm...")
+        await self.hub.wait_for("armed", lambda armed: not armed)
+        print("[INFO] Drone disarmed")
+
+        self.land_count += 1
+        print(f"[COUNT] Land events handled: {self.land_count}/{self.landings}")
+        return DONE if self.land_count >= self.landings else RETAKEOFF
+
+    async def _retakeoff(self):
+        print("[PAUSE] Waiting 5 seconds before re-takeoff...")
+        await asyncio.sleep(5)
+        await self._fly_up()
+        # The EKF often resets yaw around arming; make sure the frame has seen it before the next lane
+        self.frame.check_reset()
+        print(f"[OFFBOARD] Restarted after landing (frame heading {self.frame.heading_deg:.2f}°, "
+              f"{self.frame.resets} yaw resets).")
+        return LANE
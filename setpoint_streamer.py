@@ -0,0 +1,124 @@
+# setpoint_streamer.py
+
+import asyncio
+from mavsdk.offboard import VelocityNedYaw
+
+STOP = VelocityNedYaw(0.0, 0.0, 0.0, 0.0)
+
+
+class SetpointStreamer:
+    """
+    Owns the current offboard setpoint and publishes it at a fixed rate.
+
+    Mission code only swaps the target (set_velocity_ned / set_velocity_body
+    / set_position_ned are plain, non-awaiting calls); this task is the one
+    place that talks to drone.offboard, so the autopilot sees a steady
+    stream no matter what the other coroutines are waiting on. A new
+    target is sent right away and the fixed-rate schedule restarts from it.
+    """
+
+    def __init__(self, drone, rate_hz=20.0, initial=STOP):
+        self.drone = drone
+        self.period = 1.0 / rate_hz
+        self._target = ("set_velocity_ned", initial)
+        self._changed = asyncio.Event()
+        self._task = None
+        self.sent = 0
+        self.late = 0
+        self.errors = 0
+        self._intervals = 0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    @property
+    def target(self):
+        return self._target[1]
+
+    def set_velocity_ned(self, velocity_ned_yaw):
+        self._swap("set_velocity_ned", velocity_ned_yaw)
+
+    def set_velocity_body(self, velocity_body_yawspeed):
+        self._swap("set_velocity_body", velocity_body_yawspeed)
+
+    def set_position_ned(self, position_ned_yaw):
+        self._swap("set_position_ned", position_ned_yaw)
+
+    def stop_motion(self):
+        self._swap("set_velocity_ned", STOP)
+
+    def _swap(self, method, setpoint):
+        if (method, setpoint) == self._target:
+            return
+        self._target = (method, setpoint)
+        self._changed.set()
+
+    async def _send(self):
+        method, setpoint = self._target
+        try:
+            await getattr(self.drone.offboard, method)(setpoint)
+            self.sent += 1
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1 or self.errors % 100 == 0:
+                print(f"[STREAM] {method} failed ({self.errors} so far): {e}")
+
+    async def start(self):
+        """Send the current target once (offboard.start() needs one), then stream it."""
+        if self._task is not None:
+            return
+        await self._send()
+        self._task = asyncio.create_task(self._run())
+        print(f"[STREAM] Streaming setpoints at {1.0 / self.period:.0f} Hz")
+
+    async def stop(self):
+        """Stop streaming, e.g. before offboard.stop() and landing."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        stats = self.stats()
+        print(f"[STREAM] Stopped after {self.sent} setpoints, jitter mean {stats['jitter_mean_ms']:.1f} ms, "
+              f"max {stats['jitter_max_ms']:.1f} ms, {self.late} late, {self.errors} errors")
+
+    def stats(self):
+        mean = self._jitter_sum / self._intervals if self._intervals else 0.0
+        return {
+            "sent": self.sent,
+            "late": self.late,
+            "errors": self.errors,
+            "jitter_mean_ms": mean * 1000.0,
+            "jitter_max_ms": self._jitter_max * 1000.0,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        last = next_t = loop.time()
+        while True:
+            # Absolute deadlines so scheduling delays do not accumulate
+            next_t += self.period
+            delay = next_t - loop.time()
+            if delay < 0:
+                self.late += 1
+                next_t = loop.time()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+                self._changed.clear()
+                # New target: send now and restart the schedule from here
+                next_t = loop.time()
+            except asyncio.TimeoutError:
+                now = loop.time()
+                jitter = abs(now - last - self.period)
+                self._intervals += 1
+                self._jitter_sum += jitter
+                self._jitter_max = max(self._jitter_max, jitter)
+            last = loop.time()
+            await self._send()
@@ -0,0 +1,379 @@
+# sim_drone.py
+# Offline stand-in for mavsdk.System, no SITL / mavproxy / mavsdk_server needed.
+# Usage: python sim_drone.py "Into the Finals/Rastar_Search.py"
+
+import asyncio
+import math
+import random
+import runpy
+import sys
+import mavsdk
+from mavsdk.action import ActionError, ActionResult
+from mavsdk.core import ConnectionState
+from mavsdk.offboard import OffboardError, OffboardResult
+from mavsdk.param import AllParams, FloatParam, IntParam, ParamError, ParamResult
+from mavsdk.telemetry import (DistanceSensor, EulerAngle, Position, PositionNed, PositionVelocityNed,
+                              VelocityNed)
+
+from position_source import LocalProjection
+
+HOME = (22.688, 88.445, 10.0)
+# ArduCopter's GUIDED mode stops the vehicle when no velocity target arrives for this long
+VELOCITY_TIMEOUT_S = 3.0
+# Modes that fly the latest setpoint: ArduCopter takes them in GUIDED (hold
+# after a guided takeoff) whether or not offboard.start() was called
+SETPOINT_MODES = ("hold", "offboard")
+
+
+class PointMassModel:
+    """
+    Point-mass copter: first-order velocity response to the active
+    setpoint, takeoff/land at fixed vertical rates. Wind (a steady part
+    plus a random gust of about gust_m_s that changes over gust_tau_s)
+    pushes the copter only until the velocity loop's integrator has
+    caught up with it (wind_reject_s), as an autopilot does in every
+    mode, so what is left is the transient after takeoff and each gust.
+    Setpoints are flown as ArduCopter flies them in GUIDED: whenever the
+    copter is armed and in the air after takeoff, with velocity targets
+    dropped to zero once they are VELOCITY_TIMEOUT_S old.
+    step(dt) is pure computation so it can run as fast as the CPU allows.
+    """
+
+    def __init__(self, yaw_deg=0.0, tau_s=0.4, max_speed_m_s=2.0, climb_rate_m_s=1.0, land_rate_m_s=0.5,
+                 yaw_rate_deg_s=90.0, wind_m_s=(0.0, 0.0), position_noise_m=0.0, sonar_noise_m=0.0,
+                 sonar_max_m=7.0, seed=None, gust_m_s=0.0, gust_tau_s=2.0, wind_reject_s=0.5):
+        self.tau_s = tau_s
+        self.max_speed_m_s = max_speed_m_s
+        self.climb_rate_m_s = climb_rate_m_s
+        self.land_rate_m_s = land_rate_m_s
+        self.yaw_rate_deg_s = yaw_rate_deg_s
+        self.wind_m_s = wind_m_s
+        self.gust_m_s = gust_m_s
+        self.gust_tau_s = gust_tau_s
+        self.wind_reject_s = wind_reject_s
+        self.gust = [0.0, 0.0]
+        self.wind_estimate = [0.0, 0.0]
+        self.position_noise_m = position_noise_m
+        self.sonar_noise_m = sonar_noise_m
+        self.sonar_max_m = sonar_max_m
+        self.rng = random.Random(seed)
+
+        self.t = 0.0
+        self.pos = [0.0, 0.0, 0.0]
+        self.vel = [0.0, 0.0, 0.0]
+        self.yaw_deg = yaw_deg
+        self.armed = False
+        self.in_air = False
+        self.mode = "idle"  # idle, takeoff, hold, offboard, land
+        self.takeoff_alt_m = 2.5
+        self.setpoint_kind = None  # velocity_ned, velocity_body, position_ned
+        self.setpoint = None
+        self.setpoint_t = 0.0
+
+    def _target(self):
+        if self.mode == "takeoff":
+            remaining = -self.takeoff_alt_m - self.pos[2]
+            if abs(remaining) < 0.05:
+                self.mode = "hold"
+                return 0.0, 0.0, 0.0, self.yaw_deg
+            return 0.0, 0.0, max(-self.climb_rate_m_s, min(self.climb_rate_m_s, remaining)), self.yaw_deg
+        if self.mode == "land":
+            return 0.0, 0.0, self.land_rate_m_s, self.yaw_deg
+        if self.mode not in SETPOINT_MODES or self.setpoint is None or not self.armed:
+            return 0.0, 0.0, 0.0, self.yaw_deg
+
+        sp = self.setpoint
+        if self.setpoint_kind != "position_ned" and self.t - self.setpoint_t > VELOCITY_TIMEOUT_S:
+            return 0.0, 0.0, 0.0, self.yaw_deg
+        if self.setpoint_kind == "velocity_ned":
+            return sp.north_m_s, sp.east_m_s, sp.down_m_s, sp.yaw_deg
+        if self.setpoint_kind == "velocity_body":
+            theta = math.radians(self.yaw_deg)
+            c, s = math.cos(theta), math.sin(theta)
+            yaw = self.yaw_deg + sp.yawspeed_deg_s * 0.1
+            return sp.forward_m_s * c - sp.right_m_s * s, sp.forward_m_s * s + sp.right_m_s * c, sp.down_m_s, yaw
+        # position_ned: proportional controller capped at max speed
+        err = (sp.north_m - self.pos[0], sp.east_m - self.pos[1], sp.down_m - self.pos[2])
+        dist = math.sqrt(sum(e * e for e in err))
+        speed = min(self.max_speed_m_s, dist)
+        scale = speed / dist if dist > 1e-6 else 0.0
+        return err[0] * scale, err[1] * scale, err[2] * scale, sp.yaw_deg
+
+    def step(self, dt):
+        self.t += dt
+        if not self.in_air:
+            self.vel = [0.0, 0.0, 0.0]
+            if self.mode == "takeoff" and self.armed:
+                self.in_air = True
+            else:
+                return
+
+        vn, ve, vd, yaw = self._target()
+        alpha = min(1.0, dt / self.tau_s)
+        for i, target in enumerate((vn, ve, vd)):
+            self.vel[i] += (target - self.vel[i]) * alpha
+        yaw_err = (yaw - self.yaw_deg + 180.0) % 360.0 - 180.0
+        max_turn = self.yaw_rate_deg_s * dt
+        self.yaw_deg = (self.yaw_deg + max(-max_turn, min(max_turn, yaw_err)) + 180.0) % 360.0 - 180.0
+
+        reject = min(1.0, dt / self.wind_reject_s)
+        for i in (0, 1):
+            if self.gust_m_s:
+                # Ornstein-Uhlenbeck gust with standard deviation gust_m_s
+                self.gust[i] += (-self.gust[i] * dt / self.gust_tau_s
+                                 + self.gust_m_s * math.sqrt(2.0 * dt / self.gust_tau_s) * self.rng.gauss(0.0, 1.0))
+            air = self.wind_m_s[i] + self.gust[i]
+            self.wind_estimate[i] += (air - self.wind_estimate[i]) * reject
+            self.pos[i] += (self.vel[i] + air - self.wind_estimate[i]) * dt
+        self.pos[2] += self.vel[2] * dt
+
+        if self.pos[2] >= 0.0 and self.mode == "land":
+            # Touchdown: ArduCopter disarms on its own after landing
+            self.pos[2] = 0.0
+            self.vel = [0.0, 0.0, 0.0]
+            self.wind_estimate = [0.0, 0.0]
+            self.in_air = False
+            self.armed = False
+            self.mode = "idle"
+
+    def noisy_position(self):
+        sigma = self.position_noise_m
+        if sigma == 0.0:
+            return tuple(self.pos)
+        return tuple(p + self.rng.gauss(0.0, sigma) for p in self.pos)
+
+    def sonar_m(self):
+        height = -self.pos[2]
+        if self.sonar_noise_m:
+            height += self.rng.gauss(0.0, self.sonar_noise_m)
+        return max(0.0, min(self.sonar_max_m, height))
+
+
+def _result(result_cls, name, text):
+    return result_cls(getattr(result_cls.Result, name), text)
+
+
+class _Core:
+    def __init__(self, system):
+        self._system = system
+
+    async def connection_state(self):
+        while True:
+            yield ConnectionState(True)
+            await asyncio.sleep(1.0)
+
+
+class _Action:
+    def __init__(self, system):
+        self._model = system.model
+
+    async def arm(self):
+        self._model.armed = True
+
+    async def disarm(self):
+        if self._model.in_air:
+            raise ActionError(_result(ActionResult, "COMMAND_DENIED", "in air"), "disarm()")
+        self._model.armed = False
+
+    async def set_takeoff_altitude(self, altitude):
+        self._model.takeoff_alt_m = altitude
+
+    async def takeoff(self):
+        if not self._model.armed:
+            raise ActionError(_result(ActionResult, "COMMAND_DENIED", "not armed"), "takeoff()")
+        # A new takeoff starts from a clean GUIDED target, as does a mode change
+        self._model.setpoint = None
+        self._model.mode = "takeoff"
+
+    async def land(self):
+        if self._model.in_air:
+            self._model.mode = "land"
+
+    async def hold(self):
+        if self._model.in_air:
+            self._model.mode = "hold"
+            self._model.setpoint = None
+
+
+class _Offboard:
+    def __init__(self, system):
+        self._model = system.model
+
+    def _set(self, kind, setpoint):
+        self._model.setpoint_kind = kind
+        self._model.setpoint = setpoint
+        self._model.setpoint_t = self._model.t
+
+    async def set_velocity_ned(self, velocity_ned_yaw):
+        self._set("velocity_ned", velocity_ned_yaw)
+
+    async def set_velocity_body(self, velocity_body_yawspeed):
+        self._set("velocity_body", velocity_body_yawspeed)
+
+    async def set_position_ned(self, position_ned_yaw):
+        self._set("position_ned", position_ned_yaw)
+
+    async def start(self):
+        # Setpoints are already flown in hold; start() only marks the session active
+        if self._model.setpoint is None:
+            raise OffboardError(_result(OffboardResult, "NO_SETPOINT_SET", "no setpoint"), "start()")
+        if self._model.in_air and self._model.mode in SETPOINT_MODES:
+            self._model.mode = "offboard"
+
+    async def stop(self):
+        if self._model.mode == "offboard":
+            self._model.mode = "hold"
+        self._model.setpoint = None
+
+    async def is_active(self):
+        return self._model.mode == "offboard"
+
+
+class _Param:
+    """Parameter table; values without a fractional part are typed as int."""
+
+    def __init__(self, params):
+        self._values = {name: (float(v), float(v).is_integer()) for name, v in (params or {}).items()}
+
+    def _check(self, name, is_int, origin):
+        if name not in self._values:
+            raise ParamError(_result(ParamResult, "DOES_NOT_EXIST", name), origin)
+        if self._values[name][1] != is_int:
+            raise ParamError(_result(ParamResult, "WRONG_TYPE", name), origin)
+
+    async def get_all_params(self):
+        ints = [IntParam(n, int(v)) for n, (v, is_int) in self._values.items() if is_int]
+        floats = [FloatParam(n, v) for n, (v, is_int) in self._values.items() if not is_int]
+        return AllParams(ints, floats, [])
+
+    async def get_param_int(self, name):
+        self._check(name, True, "get_param_int()")
+        return int(self._values[name][0])
+
+    async def get_param_float(self, name):
+        self._check(name, False, "get_param_float()")
+        return self._values[name][0]
+
+    async def set_param_int(self, name, value):
+        self._check(name, True, "set_param_int()")
+        self._values[name] = (float(value), True)
+
+    async def set_param_float(self, name, value):
+        self._check(name, False, "set_param_float()")
+        self._values[name] = (float(value), False)
+
+
+class _Telemetry:
+    RATE_HZ = {
+        "position": 10.0,
+        "position_velocity_ned": 20.0,
+        "attitude_euler": 20.0,
+        "distance_sensor": 10.0,
+        "armed": 2.0,
+        "in_air": 2.0,
+    }
+
+    def __init__(self, system):
+        self._system = system
+        self._model = system.model
+        self.rates = dict(self.RATE_HZ)
+        lat, lon, alt = system.home
+        self._proj = LocalProjection(lat, lon, 0.0)
+        self._home_alt = alt
+
+    def __getattr__(self, name):
+        # set_rate_<stream>(rate_hz) for every simulated stream
+        if name.startswith("set_rate_") and name[9:] in self.RATE_HZ:
+            async def set_rate(rate_hz):
+                self.rates[name[9:]] = rate_hz
+            return set_rate
+        raise AttributeError(name)
+
+    async def _stream(self, name, sample):
+        while True:
+            yield sample()
+            await asyncio.sleep(1.0 / self.rates[name])
+
+    def position(self):
+        def sample():
+            n, e, d = self._model.noisy_position()
+            lat = self._proj.origin_lat_deg + n / self._proj.m_per_deg_lat
+            lon = self._proj.origin_lon_deg + e / self._proj.m_per_deg_lon
+            return Position(lat, lon, self._home_alt - d, -d)
+        return self._stream("position", sample)
+
+    def position_velocity_ned(self):
+        def sample():
+            n, e, d = self._model.noisy_position()
+            v = self._model.vel
+            return PositionVelocityNed(PositionNed(n, e, d), VelocityNed(v[0], v[1], v[2]))
+        return self._stream("position_velocity_ned", sample)
+
+    def attitude_euler(self):
+        def sample():
+            m = self._model
+            # Level flight only; the scripts read nothing but yaw
+            return EulerAngle(0.0, 0.0, m.yaw_deg, int(m.t * 1e6))
+        return self._stream("attitude_euler", sample)
+
+    def distance_sensor(self):
+        def sample():
+            return DistanceSensor(0.2, self._model.sonar_max_m, self._model.sonar_m(), None)
+        return self._stream("distance_sensor", sample)
+
+    def armed(self):
+        return self._stream("armed", lambda: self._model.armed)
+
+    def in_air(self):
+        return self._stream("in_air", lambda: self._model.in_air)
+
+
+class SimSystem:
+    """
+    Drop-in for mavsdk.System with the surface the mission scripts use.
+    Physics runs on the event loop clock, so it keeps pace with whatever
+    clock the loop has (real or virtual).
+    """
+
+    def __init__(self, mavsdk_server_address=None, port=None, model=None, home=HOME, physics_hz=100.0,
+                 params=None):
+        self.model = model or PointMassModel()
+        self.home = home
+        self.physics_dt = 1.0 / physics_hz
+        self.core = _Core(self)
+        self.action = _Action(self)
+        self.offboard = _Offboard(self)
+        self.param = _Param(params)
+        self.telemetry = _Telemetry(self)
+        self._physics_task = None
+
+    async def connect(self, system_address=None):
+        if self._physics_task is None:
+            self._physics_task = asyncio.create_task(self._physics())
+        print("[SIM] Simulated drone ready")
+
+    async def _physics(self):
+        loop = asyncio.get_event_loop()
+        last = loop.time()
+        while True:
+            await asyncio.sleep(self.physics_dt)
+            now = loop.time()
+            self.model.step(now - last)
+            last = now
+
+
+def run_script(path, model=None):
+    """Run an unchanged mission script against SimSystem."""
+    def make_system(*args, **kwargs):
+        kwargs.setdefault("model", model)
+        return SimSystem(*args, **kwargs)
+    mavsdk.System = make_system
+    sys.argv = [path]
+    runpy.run_path(path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print('Usage: python sim_drone.py "<mission script>.py"')
+        sys.exit(1)
+    run_script(sys.argv[1])
@@ -0,0 +1,139 @@
+# stream_rates.py
+# Usage: python stream_rates.py [leg|hover|status] [baud]
+#   Applies a rate profile to the connected drone and prints what it achieves.
+
+import asyncio
+import math
+import sys
+from mavsdk.telemetry import TelemetryError
+
+# Requested rates in Hz, most important stream first: when a link cannot
+# carry a profile, the streams at the end are cut back first.
+PROFILES = {
+    # Legs: the distance loop in motion.py runs on position_velocity_ned
+    "leg": {"position_velocity_ned": 50.0, "distance_sensor": 20.0, "attitude_euler": 10.0, "position": 2.0,
+            "in_air": 1.0},
+    "hover": {"position_velocity_ned": 10.0, "distance_sensor": 10.0, "attitude_euler": 5.0, "position": 1.0,
+              "in_air": 1.0},
+    "status": {"position_velocity_ned": 1.0, "distance_sensor": 1.0, "attitude_euler": 1.0, "position": 1.0,
+               "in_air": 1.0},
+}
+
+# MAVLink 2 bytes on the wire per sample: 12 header/CRC + payload
+WIRE_BYTES = {
+    "position_velocity_ned": 12 + 28,  # LOCAL_POSITION_NED
+    "distance_sensor": 12 + 14,  # DISTANCE_SENSOR
+    "attitude_euler": 12 + 28,  # ATTITUDE
+    "position": 12 + 28,  # GLOBAL_POSITION_INT
+    "in_air": 12 + 2,  # EXTENDED_SYS_STATE
+}
+# Share of a serial link these streams may take; the rest is left for
+# heartbeats, command traffic and the autopilot's own stream groups
+LINK_SHARE = 0.5
+MIN_RATE_HZ = 1.0
+# Measured below this fraction of the request counts as not achieved
+ACHIEVED_FRACTION = 0.8
+
+
+def link_budget(baud, share=LINK_SHARE):
+    """Bytes per second the profile may use on a serial link (8N1: 10 bits a byte)."""
+    return baud / 10.0 * share
+
+
+def profile_load(rates):
+    return sum(WIRE_BYTES.get(name, 40) * hz for name, hz in rates.items())
+
+
+def fit_profile(rates, budget_bytes_s):
+    """
+    The profile cut down to fit the budget: the least important streams
+    drop towards MIN_RATE_HZ first, and only if that is not enough is
+    the most important one slowed down too.
+    """
+    fitted = dict(rates)
+    names = list(fitted)
+    for name in reversed(names):
+        excess = profile_load(fitted) - budget_bytes_s
+        if excess <= 0:
+            return fitted
+        floor = min(fitted[name], MIN_RATE_HZ)
+        cut = min(fitted[name] - floor, excess / WIRE_BYTES.get(name, 40))
+        # Rounded down to 0.1 Hz so the cut never falls short
+        fitted[name] = max(floor, math.floor((fitted[name] - cut) * 10) / 10)
+    return fitted
+
+
+async def set_rates(drone, rates):
+    """Request every rate; returns {stream: error} for the ones the autopilot refused."""
+    errors = {}
+    for name, hz in rates.items():
+        try:
+            await getattr(drone.telemetry, f"set_rate_{name}")(hz)
+        except (TelemetryError, AttributeError) as e:
+            errors[name] = e
+    return errors
+
+
+async def _measure(stream, window_s):
+    loop = asyncio.get_running_loop()
+    stamps = []
+
+    async def count():
+        async for _ in stream:
+            stamps.append(loop.time())
+
+    task = asyncio.create_task(count())
+    await asyncio.sleep(window_s)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    if len(stamps) < 2:
+        return len(stamps) / window_s
+    return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+
+
+async def measure_rates(drone, names, window_s=2.0):
+    """{stream: Hz} actually received, all streams counted over the same window."""
+    rates = await asyncio.gather(*(_measure(getattr(drone.telemetry, name)(), window_s) for name in names))
+    return dict(zip(names, rates))
+
+
+async def apply_profile(drone, profile="leg", baud=None, verify=True, window_s=2.0):
+    """
+    Request a profile's rates (fitted to a serial link's budget when baud
+    is given) and, with verify, measure what actually arrives.
+    Returns {stream: (requested_hz, measured_hz or None)}.
+    """
+    rates = PROFILES[profile] if isinstance(profile, str) else dict(profile)
+    if baud:
+        budget = link_budget(baud)
+        fitted = fit_profile(rates, budget)
+        if fitted != rates:
+            print(f"[RATE] {profile_load(rates):.0f} B/s does not fit {budget:.0f} B/s at {baud} baud, "
+                  f"cut to {profile_load(fitted):.0f} B/s")
+        rates = fitted
+
+    errors = await set_rates(drone, rates)
+    for name, error in errors.items():
+        print(f"[RATE] {name}: rate not set ({error})")
+
+    measured = await measure_rates(drone, list(rates), window_s) if verify else {}
+    report = {}
+    for name, hz in rates.items():
+        got = measured.get(name)
+        report[name] = (hz, got)
+        if got is None:
+            print(f"[RATE] {name:<22} {hz:5.1f} Hz requested")
+            continue
+        flag = "" if got >= hz * ACHIEVED_FRACTION else "  (LOW)"
+        print(f"[RATE] {name:<22} {hz:5.1f} Hz requested, {got:5.1f} Hz measured{flag}")
+    return report
+
+
+if __name__ == "__main__":
+    from mav_sdk_controller import connect_drone
+
+    async def main(profile, baud):
+        drone = await connect_drone(use_udp=baud is None, rates=None)
+        await apply_profile(drone, profile, baud)
+
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "leg", int(sys.argv[2]) if len(sys.argv) > 2 else None))
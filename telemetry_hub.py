@@ -0,0 +1,128 @@
+# telemetry_hub.py
+
+import asyncio
+
+# Streams every mission script reads from
+DEFAULT_STREAMS = (
+    "position",
+    "position_velocity_ned",
+    "attitude_euler",
+    "distance_sensor",
+    "armed",
+    "in_air",
+)
+
+
+class TelemetryHub:
+    """
+    Keeps one subscription open per MAVSDK telemetry stream and caches the
+    latest sample with its receive time on the event loop clock.
+
+    latest() reads the cache without awaiting, get() waits for the first
+    sample if none has arrived yet, next() waits for the next update.
+    subscribe() runs a plain callback on every sample, for code that must
+    not miss one between its own reads.
+    """
+
+    def __init__(self, drone, streams=DEFAULT_STREAMS):
+        self.drone = drone
+        self.streams = tuple(streams)
+        self._samples = {name: None for name in self.streams}
+        self._stamps = {name: 0.0 for name in self.streams}
+        self._updates = {name: asyncio.Event() for name in self.streams}
+        self._callbacks = {name: [] for name in self.streams}
+        self._tasks = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def start(self):
+        if self._tasks:
+            return
+        for name in self.streams:
+            self._tasks.append(asyncio.create_task(self._pump(name)))
+        print(f"[HUB] Subscribed to {len(self.streams)} telemetry streams")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        print("[HUB] Telemetry streams closed")
+
+    async def _pump(self, name):
+        stream = getattr(self.drone.telemetry, name)
+        while True:
+            try:
+                async for sample in stream():
+                    self._publish(name, sample)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[HUB] Stream '{name}' failed: {e}, resubscribing")
+                await asyncio.sleep(0.5)
+
+    def _publish(self, name, sample):
+        self._samples[name] = sample
+        self._stamps[name] = asyncio.get_running_loop().time()
+        # Wake everyone waiting on this update and arm a fresh event
+        event = self._updates[name]
+        self._updates[name] = asyncio.Event()
+        event.set()
+        for callback in self._callbacks[name]:
+            callback(sample)
+
+    def subscribe(self, name, callback):
+        """Call callback(sample) on the event loop for every sample of a stream."""
+        self._callbacks[name].append(callback)
+
+    def unsubscribe(self, name, callback):
+        if callback in self._callbacks[name]:
+            self._callbacks[name].remove(callback)
+
+    def latest(self, name):
+        """Latest sample of a stream, or None if nothing has arrived yet."""
+        return self._samples[name]
+
+    def timestamp(self, name):
+        """Loop time of the latest sample, 0.0 if none yet."""
+        return self._stamps[name]
+
+    def age(self, name):
+        """Seconds since the latest sample of a stream was received."""
+        if self._samples[name] is None:
+            return float("inf")
+        return asyncio.get_running_loop().time() - self._stamps[name]
+
+    async def next(self, name, timeout=None):
+        """Wait for the next update of a stream and return it."""
+        event = self._updates[name]
+        if timeout is None:
+            await event.wait()
+        else:
+            await asyncio.wait_for(event.wait(), timeout)
+        return self._samples[name]
+
+    async def get(self, name, timeout=None):
+        """Latest sample, waiting for the first one if the cache is empty."""
+        sample = self._samples[name]
+        if sample is None:
+            sample = await self.next(name, timeout)
+        return sample
+
+    async def wait_for(self, name, predicate, timeout=None):
+        """Wait until a sample of the stream satisfies predicate and return it."""
+        sample = self._samples[name]
+        if sample is not None and predicate(sample):
+            return sample
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            sample = await self.next(name, remaining)
+            if predicate(sample):
+                return sample
@@ -0,0 +1,52 @@
+# tests/test_sim_drone.py
+# Runs unmodified mission scripts against sim_drone on the virtual clock.
+# Usage: python -m pytest tests
+
+import asyncio
+import math
+import os
+import re
+import sys
+
+import mavsdk
+import pytest
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import time_warp
+from sim_drone import run_script
+
+# Leg velocities and durations of Mission_start_left_with_logs.py
+LEFT_START_LEGS = [((-0.2, 0.6), 10), ((-0.2, -0.1), 10), ((-0.09, -0.69), 10), ((0.54, 0.19), 10)]
+LAND_LINE = re.compile(r"LAND \(relative\): X=(-?[\d.]+) m, Y=(-?[\d.]+) m")
+
+
+@pytest.fixture
+def sim(tmp_path, monkeypatch):
+    """Run scripts in tmp_path, on the virtual clock, with no GUI server to talk to."""
+    def no_server(*args, **kwargs):
+        raise requests.ConnectionError("no GUI in tests")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(mavsdk, "System", mavsdk.System)
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    monkeypatch.setattr(requests, "get", no_server)
+    monkeypatch.setattr(requests, "post", no_server)
+    time_warp.install()
+    yield tmp_path
+    asyncio.set_event_loop_policy(None)
+
+
+def test_guided_script_flies_every_leg(sim, capsys):
+    # The script never calls offboard.start(): ArduCopter flies GUIDED setpoints anyway
+    run_script(os.path.join(ROOT, "mav_sdk_test", "Mission_start_left_with_logs.py"))
+    out = capsys.readouterr().out
+    assert "[TIMEOUT]" not in out
+    assert out.count("[REACHED]") >= len(LEFT_START_LEGS)
+
+    with open(sim / "flight_log.txt") as f:
+        lands = [tuple(map(float, m.groups())) for m in LAND_LINE.finditer(f.read())]
+    assert len(lands) == len(LEFT_START_LEGS)
+    for ((vn, ve), duration), (x, y) in zip(LEFT_START_LEGS, lands):
+        assert math.hypot(x, y) == pytest.approx(math.hypot(vn, ve) * duration, abs=0.3)
+        assert math.atan2(y, x) == pytest.approx(math.atan2(ve, vn), abs=0.1)
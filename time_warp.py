@@ -0,0 +1,134 @@
+# time_warp.py
+# Virtual-clock event loop: when nothing is runnable and no I/O is ready, the
+# clock jumps straight to the next timer instead of sleeping.
+# Usage: python time_warp.py "Into the Finals/Rastar_Search.py"   (with sim_drone)
+
+import asyncio
+import selectors
+import socket
+import sys
+import time
+
+
+class _WarpSelector:
+    """
+    Wraps the real selector; a timed wait becomes a clock jump, unless
+    real I/O is in flight (executor work or a connected stream socket),
+    in which case it really waits and the clock moves by the real time.
+    """
+
+    def __init__(self, loop, selector):
+        self._loop = loop
+        self._selector = selector
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+    def select(self, timeout=None):
+        # Poll real I/O first (sockets, executor wake-ups) without blocking
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # No timers at all: only real I/O can make progress
+            return self._selector.select(None)
+        if self._loop._executor_pending or self._stream_registered():
+            # A jump would fire an HTTP timeout before the reply could arrive
+            start = time.monotonic()
+            events = self._selector.select(timeout)
+            self._loop.advance(min(timeout, time.monotonic() - start))
+            return events
+        self._loop.advance(timeout)
+        return []
+
+    def _stream_registered(self):
+        # Datagram sockets (the UDP push listener) only wait for events and
+        # do not hold the clock; the loop's own self-pipe is skipped
+        self_pipe = self._loop._ssock.fileno()
+        for key in self._selector.get_map().values():
+            if key.fd == self_pipe:
+                continue
+            try:
+                sock = socket.socket(fileno=key.fd)
+            except OSError:
+                continue
+            try:
+                if sock.type == socket.SOCK_STREAM:
+                    return True
+            finally:
+                sock.detach()
+        return False
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    SelectorEventLoop whose time() is a virtual clock.
+
+    asyncio.sleep, wait_for timeouts and loop.time() elapsed checks all
+    run on it, so unchanged mission code finishes as fast as the CPU can
+    step it. While executor work or a TCP connection (aiohttp requests,
+    the SSE stream) is in flight the loop waits in real time instead, so
+    their timeouts mean what they say; the run only warps between them.
+    UDP pushes are picked up on the next poll, at whatever virtual time
+    that is.
+    """
+
+    def __init__(self, start=0.0):
+        self._virtual_time = start
+        self._executor_pending = 0
+        self.jumps = 0
+        self.warped_s = 0.0
+        super().__init__(_WarpSelector(self, selectors.DefaultSelector()))
+        self._real_start = time.monotonic()
+
+    def time(self):
+        return self._virtual_time
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._executor_pending += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, future):
+        self._executor_pending -= 1
+
+    def advance(self, seconds):
+        self._virtual_time += seconds
+        self.jumps += 1
+        self.warped_s += seconds
+
+    def speedup(self):
+        real = time.monotonic() - self._real_start
+        return self.warped_s / real if real > 0 else float("inf")
+
+    def close(self):
+        if not self.is_closed():
+            real = time.monotonic() - self._real_start
+            print(f"[WARP] {self.warped_s:.1f}s virtual in {real:.2f}s real ({self.speedup():.0f}x)")
+        super().close()
+
+
+class VirtualClockPolicy(asyncio.DefaultEventLoopPolicy):
+    def new_event_loop(self):
+        return VirtualClockLoop()
+
+
+def install():
+    """Make every later asyncio.run() / new_event_loop() use the virtual clock."""
+    asyncio.set_event_loop_policy(VirtualClockPolicy())
+
+
+def run(coro):
+    """asyncio.run() on a fresh VirtualClockLoop."""
+    with asyncio.Runner(loop_factory=VirtualClockLoop) as runner:
+        return runner.run(coro)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print('Usage: python time_warp.py "<mission script>.py"')
+        sys.exit(1)
+    from sim_drone import run_script
+    install()
+    run_script(sys.argv[1])
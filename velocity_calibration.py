@@ -0,0 +1,277 @@
+# velocity_calibration.py
+# Usage: python velocity_calibration.py --mission Missions/right_start.json flight_log.txt flight_log.bin [...]
+#          [--mission Missions/left_start.json more_logs ...] [--heading deg] [--flown-with table.json]
+#          [--out table.json]
+#   Fits per-axis gain and lag between the velocities a mission commands and
+#   the displacement its logs record, over every log at once, and writes the
+#   correction table mission_plan.load_plan applies. Logs must come from
+#   open-loop flights (one velocity per leg for a fixed time).
+#
+#   Text logs (.txt) only count through their LAND (relative) endpoints: the
+#   " | X: .." lines are written from the buffered telemetry.position()
+#   stream every 2 s, so their timestamps are when the line was written, not
+#   when the fix was taken. Endpoints give the gain but say nothing about the
+#   lag; that needs FlightRecorder files (.bin), whose records are stamped
+#   when they are sampled.
+
+import json
+import sys
+import numpy as np
+
+from log_ingest import load_log, EVENT_LAND_RELATIVE
+from flight_recorder import read_records, MARK_TAKEOFF, MARK_LAND
+from mission_plan import compile_mission, load_mission, load_correction, CORRECTION_PATH
+
+AXES = ("north", "east")
+# Candidate lags scanned in one vectorised least-squares pass
+LAGS_S = np.arange(0.0, 3.0 + 1e-9, 0.05)
+# Gains outside this range almost always mean a log paired with the wrong mission
+MIN_GAIN, MAX_GAIN = 0.2, 2.0
+# Endpoint and recorder gains further apart than this mean one of them is wrong
+AGREE_FRACTION = 0.25
+# Share of the measured displacement the fitted model must explain
+MIN_R2 = 0.8
+# A landing further than this (or AGREE_FRACTION of the leg) from the fitted
+# prediction means the log and the mission do not belong together
+MAX_ENDPOINT_ERROR_M = 0.5
+
+# Observation kinds
+ENDPOINT = 0
+SERIES = 1
+
+
+def _segments(plan):
+    """
+    Per flight leg (takeoff to landing), the plan legs flown in it as
+    (vn, ve, start_s, duration_s); waypoint legs before a land share its clock.
+    """
+    legs, current, t = [], [], 0.0
+    for leg in plan:
+        current.append((leg.command.north_m_s, leg.command.east_m_s, t, leg.duration_s))
+        t += leg.duration_s
+        if leg.lands:
+            legs.append(current)
+            current, t = [], 0.0
+    if current:
+        legs.append(current)
+    return legs
+
+
+def text_observations(path):
+    """
+    One ENDPOINT observation per LAND (relative) line: (leg, t_s, north_m, east_m, kind).
+    t_s is infinite, as the endpoint comes after the whole command.
+    """
+    log = load_log(path)
+    lands = log.events_of(EVENT_LAND_RELATIVE)
+    n = len(lands)
+    for leg in log.legs():
+        # Only a diagnostic: the samples are never fitted
+        if len(leg) == 0:
+            continue
+        land = lands[lands["leg"] == leg["leg"][0]]
+        if len(land):
+            logged = np.hypot(leg["x_m"][-1] - leg["x_m"][0], leg["y_m"][-1] - leg["y_m"][0])
+            landed = np.hypot(land["x_m"][0], land["y_m"][0])
+            if abs(logged - landed) > 0.5:
+                print(f"[CAL] {path}: leg {int(leg['leg'][0])} samples show {logged:.2f} m, "
+                      f"LAND (relative) {landed:.2f} m; samples are stale and not used")
+    return (lands["leg"].astype(int), np.full(n, np.inf), lands["x_m"].astype(float),
+            lands["y_m"].astype(float), np.full(n, ENDPOINT))
+
+
+def recorder_observations(path):
+    """
+    SERIES observations from a FlightRecorder file: every record from each
+    MARK_TAKEOFF to the next MARK_LAND, relative to the takeoff record.
+    """
+    records = read_records(path)
+    takeoffs = np.flatnonzero(records["marker"] == MARK_TAKEOFF)
+    lands = np.flatnonzero(records["marker"] == MARK_LAND)
+    out = [[], [], [], [], []]
+    for leg, start in enumerate(takeoffs):
+        after = lands[lands > start]
+        end = after[0] + 1 if len(after) else len(records)
+        r = records[start:end]
+        r = r[np.isfinite(r["north_m"]) & np.isfinite(r["east_m"])]
+        if len(r) == 0:
+            continue
+        out[0].append(np.full(len(r), leg))
+        out[1].append(r["t"] - r["t"][0])
+        out[2].append((r["north_m"] - r["north_m"][0]).astype(float))
+        out[3].append((r["east_m"] - r["east_m"][0]).astype(float))
+        out[4].append(np.full(len(r), SERIES))
+    if not out[0]:
+        empty = np.empty(0)
+        return empty.astype(int), empty, empty, empty, empty.astype(int)
+    return tuple(np.concatenate(column) for column in out)
+
+
+def _design(leg_idx, t, segments, axis, lags):
+    """
+    (L, N) predicted displacement per unit gain for every candidate lag:
+    each segment's velocity integrated over its window, delayed by the lag.
+    """
+    x = np.zeros((len(lags), len(t)))
+    for leg, legs in enumerate(segments):
+        mask = leg_idx == leg
+        if not mask.any():
+            continue
+        shifted = t[mask][None, :] - lags[:, None]
+        for vn, ve, start, duration in legs:
+            v = vn if axis == 0 else ve
+            if v:
+                x[:, mask] += v * np.clip(shifted - start, 0.0, duration)
+    return x
+
+
+def fit_axis(x, d):
+    """
+    Closed-form least-squares gain for every candidate lag at once.
+    Returns (gains, sse), one per lag, or None when the axis was never
+    commanded.
+    """
+    xd = x @ d
+    xx = np.einsum("ln,ln->l", x, x)
+    if not xx.any():
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gains = np.where(xx > 0, xd / xx, 0.0)
+        sse = d @ d - np.where(xx > 0, xd * xd / xx, 0.0)
+    return gains, np.maximum(sse, 0.0)
+
+
+def _fit_one(name, x, d, kind, lags):
+    """
+    Fit one axis. Returns its table entry, or (None, reason) when the fit
+    cannot be trusted.
+    """
+    fit = fit_axis(x, d)
+    if fit is None:
+        print(f"[CAL] {name}: never commanded, left uncorrected")
+        return {"gain": 1.0, "lag_s": 0.0, "lag_fitted": False, "observations": 0, "rms_m": None}, None
+    gains, sse = fit
+    series = kind == SERIES
+    if series.any():
+        best = int(np.argmin(sse))
+        if best in (0, len(lags) - 1):
+            return None, (f"{name}: best lag is the edge of the {lags[0]:.2f}-{lags[-1]:.2f}s grid "
+                          f"({lags[best]:.2f}s), lag not identified")
+        lag, lag_fitted = float(lags[best]), True
+    else:
+        # Endpoints do not depend on the lag: every column is the same
+        best, lag, lag_fitted = 0, 0.0, False
+        print(f"[CAL] {name}: endpoints only, lag not fitted (add FlightRecorder .bin files)")
+    gain = float(gains[best])
+
+    if series.any() and not series.all():
+        parts = [fit_axis(x[best:best + 1, m], d[m]) for m in (~series, series)]
+        if all(p is not None for p in parts):
+            g_end, g_rec = parts[0][0][0], parts[1][0][0]
+            if g_rec <= 0 or abs(g_end / g_rec - 1.0) > AGREE_FRACTION:
+                return None, (f"{name}: LAND endpoints give gain {g_end:.3f}, recorder data {g_rec:.3f}; "
+                              f"they disagree by more than {AGREE_FRACTION:.0%}")
+
+    rms = float(np.sqrt(sse[best] / len(d)))
+    endpoint = ~series
+    predicted = gain * x[best, endpoint]
+    off = np.abs(d[endpoint] - predicted) > np.maximum(MAX_ENDPOINT_ERROR_M, AGREE_FRACTION * np.abs(predicted))
+    if off.any():
+        worst = int(np.argmax(np.abs(d[endpoint] - predicted)))
+        return None, (f"{name}: {int(off.sum())} of {int(endpoint.sum())} LAND endpoints miss the fitted gain "
+                      f"{gain:.3f} (worst: {d[endpoint][worst]:.2f} m logged, {predicted[worst]:.2f} m predicted)")
+    r2 = 1.0 - sse[best] / (d @ d) if d @ d > 0 else 0.0
+    if r2 < MIN_R2:
+        return None, (f"{name}: gain {gain:.3f} explains only {r2:.0%} of the measured displacement "
+                      f"(rms {rms:.3f} m over {len(d)} observations); the logs do not fit one gain")
+    print(f"[CAL] {name}: gain {gain:.3f}, lag {lag:.2f}s{'' if lag_fitted else ' (not fitted)'}, "
+          f"rms {rms:.3f} m over {len(d)} observations ({int(series.sum())} recorder)")
+    return {"gain": round(gain, 4), "lag_s": round(lag, 2), "lag_fitted": lag_fitted,
+            "observations": int(len(d)), "rms_m": round(rms, 3)}, None
+
+
+def calibrate(runs, heading_deg=0.0, flown_with=None, lags=LAGS_S):
+    """
+    runs: [(mission_path, [log paths])], .bin files read as FlightRecorder
+    data and anything else as a text log. Stacks every observation from
+    every log and fits each axis in one pass. Returns (table, problems);
+    the table must not be written while problems is non-empty.
+    """
+    correction = load_correction(flown_with)
+    columns, segments, sources = [[], [], [], [], []], [], []
+    offset = 0
+    for mission_path, log_paths in runs:
+        # Fitted against the commands actually flown, not the nominal velocities
+        plan = compile_mission(load_mission(mission_path), heading_deg, correction)
+        legs = _segments(plan)
+        for path in log_paths:
+            recorder = path.endswith(".bin")
+            idx, t, dn, de, kind = recorder_observations(path) if recorder else text_observations(path)
+            keep = idx < len(legs)
+            if not keep.all():
+                print(f"[CAL] {path}: legs past {len(legs)} have no match in {plan.name}, ignored")
+            print(f"[CAL] {path}: {int(keep.sum())} {'recorder' if recorder else 'endpoint'} observations "
+                  f"in {len(set(idx[keep].tolist()))} legs of {plan.name}")
+            # Leg numbers made unique across logs so one design matrix covers all of them
+            for column, values in zip(columns, (idx[keep] + offset, t[keep], dn[keep], de[keep], kind[keep])):
+                column.append(values)
+            segments.extend(legs)
+            offset += len(legs)
+            sources.append({"log": path, "mission": mission_path})
+
+    leg_idx, t, dn, de, kind = (np.concatenate(column) for column in columns)
+    table = {"heading_deg": heading_deg, "sources": sources}
+    problems = []
+    if len(t) == 0:
+        return table, ["no observations"]
+    for axis, (name, d) in enumerate(zip(AXES, (dn, de))):
+        entry, problem = _fit_one(name, _design(leg_idx, t, segments, axis, lags), d, kind, lags)
+        if problem:
+            problems.append(problem)
+            continue
+        if not MIN_GAIN <= entry["gain"] <= MAX_GAIN:
+            problems.append(f"{name}: gain {entry['gain']:.3f} outside [{MIN_GAIN}, {MAX_GAIN}]")
+        table[name] = entry
+    return table, problems
+
+
+def _parse_args(args):
+    runs, options = [], {"heading_deg": 0.0, "out": CORRECTION_PATH, "flown_with": None}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--mission":
+            runs.append((args[i + 1], []))
+            i += 1
+        elif arg == "--heading":
+            options["heading_deg"] = float(args[i + 1])
+            i += 1
+        elif arg == "--flown-with":
+            options["flown_with"] = args[i + 1]
+            i += 1
+        elif arg == "--out":
+            options["out"] = args[i + 1]
+            i += 1
+        elif runs:
+            runs[-1][1].append(arg)
+        else:
+            raise ValueError(f"{arg}: give --mission <mission.json> before its logs")
+        i += 1
+    return [run for run in runs if run[1]], options
+
+
+if __name__ == "__main__":
+    runs, options = _parse_args(sys.argv[1:])
+    if not runs:
+        print("Usage: python velocity_calibration.py --mission <mission.json> <log.txt|log.bin> [...] "
+              "[--mission ...] [--heading deg] [--flown-with table.json] [--out table.json]")
+        sys.exit(1)
+    table, problems = calibrate(runs, options["heading_deg"], options["flown_with"])
+    if problems:
+        for problem in problems:
+            print(f"[CAL] {problem}")
+        print("[CAL] Table not written")
+        sys.exit(1)
+    with open(options["out"], "w") as f:
+        json.dump(table, f, indent=2)
+    print(f"[CAL] Correction table written to {options['out']}")
@@ -0,0 +1,287 @@
+# yellow_detector.py
+# Usage:
+#   python yellow_detector.py                 camera 0, raises YELLOW on the control panel
+#   python yellow_detector.py 1 --scale 2     camera 1 at half resolution
+#   python yellow_detector.py "Frames/*.npy" --roi 0.5,1,0,1 --dry-run
+#     --scale N      keep every Nth pixel before thresholding
+#     --roi t,b,l,r  crop to that fraction of the frame (rows t..b, columns l..r)
+#     --rgb          frames are RGB (camera and image files are BGR)
+#     --dry-run      print detections only, never trigger YELLOW
+
+import glob
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+import numpy as np
+
+GUI_URL = "http://localhost:8000"
+
+# HSV on the OpenCV scale: H 0..179, S and V 0..255
+YELLOW_LOW = (20, 100, 100)
+YELLOW_HIGH = (35, 255, 255)
+
+Detection = namedtuple("Detection", "found area_frac centroid bbox elapsed_ms")
+
+
+def to_hsv(frame, bgr=True):
+    """(H, S, V) uint8 planes of an (rows, cols, 3) uint8 frame, OpenCV scale."""
+    rgb = frame.astype(np.int32)
+    if bgr:
+        b, g, r = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    else:
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    v = np.maximum(np.maximum(r, g), b)
+    delta = v - np.minimum(np.minimum(r, g), b)
+    s = np.where(v > 0, delta * 255 // np.maximum(v, 1), 0)
+
+    d = np.maximum(delta, 1).astype(np.float32)
+    h = np.where(v == r, (g - b) / d, np.where(v == g, 2.0 + (b - r) / d, 4.0 + (r - g) / d))
+    h = np.where(delta > 0, (h * 30.0) % 180.0, 0.0)
+    return h.astype(np.uint8), s.astype(np.uint8), v.astype(np.uint8)
+
+
+def yellow_mask(frame, low=YELLOW_LOW, high=YELLOW_HIGH, bgr=True):
+    h, s, v = to_hsv(frame, bgr)
+    return ((h >= low[0]) & (h <= high[0]) & (s >= low[1]) & (s <= high[1])
+            & (v >= low[2]) & (v <= high[2]))
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def regions(mask):
+    """
+    4-connected regions of a boolean mask as (areas, row_lo, row_hi,
+    col_lo, col_hi, row_sum, col_sum) arrays, one entry per region.
+
+    Works on row runs rather than pixels: runs are found with one diff,
+    the runs each run touches in the next row with two searchsorted calls,
+    and only those run pairs go through a small union-find.
+    """
+    rows, cols = mask.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_row, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1)
+    n = len(run_row)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return (empty,) * 7
+
+    # Runs in row r + 1 overlapping run i: end_j > start_i and start_j < end_i
+    stride = cols + 1
+    start_keys = run_row * stride + run_start
+    end_keys = run_row * stride + run_end
+    lo = np.searchsorted(end_keys, (run_row + 1) * stride + run_start, side="right")
+    hi = np.searchsorted(start_keys, (run_row + 1) * stride + run_end, side="left")
+    counts = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(n), counts)
+    b = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    parent = list(range(n))
+    for i, j in zip(a.tolist(), b.tolist()):
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    roots = np.array([_find(parent, i) for i in range(n)])
+    labels = np.unique(roots, return_inverse=True)[1]
+
+    length = run_end - run_start
+    k = labels.max() + 1
+    areas = np.bincount(labels, weights=length, minlength=k).astype(np.int64)
+    row_sum = np.bincount(labels, weights=length * run_row, minlength=k)
+    # Sum of columns start..end-1 of each run
+    col_sum = np.bincount(labels, weights=(run_start + run_end - 1) * length / 2.0, minlength=k)
+    row_lo = np.full(k, rows)
+    row_hi = np.full(k, -1)
+    col_lo = np.full(k, cols)
+    col_hi = np.full(k, -1)
+    np.minimum.at(row_lo, labels, run_row)
+    np.maximum.at(row_hi, labels, run_row)
+    np.minimum.at(col_lo, labels, run_start)
+    np.maximum.at(col_hi, labels, run_end - 1)
+    return areas, row_lo, row_hi, col_lo, col_hi, row_sum, col_sum
+
+
+class YellowDetector:
+    """
+    Per-frame yellow tape check: downscale by striding, crop to the region
+    of interest, HSV threshold, then keep the largest connected region.
+    A frame counts as yellow when that region covers min_area_frac of the
+    crop, so specks of noise never trigger on their own.
+    """
+
+    def __init__(self, scale=1, roi=(0.0, 1.0, 0.0, 1.0), min_area_frac=0.01, bgr=True,
+                 low=YELLOW_LOW, high=YELLOW_HIGH):
+        self.scale = max(1, int(scale))
+        self.roi = roi
+        self.min_area_frac = min_area_frac
+        self.bgr = bgr
+        self.low = low
+        self.high = high
+
+    def crop(self, frame):
+        small = frame[::self.scale, ::self.scale]
+        rows, cols = small.shape[:2]
+        top, bottom, left, right = self.roi
+        return small[int(top * rows):int(bottom * rows), int(left * cols):int(right * cols)]
+
+    def detect(self, frame):
+        start = time.perf_counter()
+        view = self.crop(frame)
+        mask = yellow_mask(view, self.low, self.high, self.bgr)
+        areas, row_lo, row_hi, col_lo, col_hi, row_sum, col_sum = regions(mask)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if len(areas) == 0:
+            return Detection(False, 0.0, None, None, elapsed_ms)
+
+        best = int(np.argmax(areas))
+        rows, cols = mask.shape
+        area_frac = areas[best] / float(rows * cols)
+        # Centroid and box as fractions of the crop (x = column, y = row)
+        centroid = (float(col_sum[best] / areas[best] / cols), float(row_sum[best] / areas[best] / rows))
+        bbox = (float(col_lo[best] / cols), float(row_lo[best] / rows),
+                float((col_hi[best] + 1) / cols), float((row_hi[best] + 1) / rows))
+        return Detection(area_frac >= self.min_area_frac, float(area_frac), centroid, bbox, elapsed_ms)
+
+
+class YellowTrigger:
+    """
+    Turns per-frame detections into single YELLOW presses. Fires after
+    confirm_frames yellow frames in a row and re-arms after clear_frames
+    frames without tape, so one border crossing is one press.
+    """
+
+    def __init__(self, on_yellow, confirm_frames=2, clear_frames=5):
+        self.on_yellow = on_yellow
+        self.confirm_frames = confirm_frames
+        self.clear_frames = clear_frames
+        self.triggers = 0
+        self._seen = 0
+        self._clear = 0
+        self._armed = True
+
+    def update(self, detection):
+        if detection.found:
+            self._seen += 1
+            self._clear = 0
+        else:
+            self._seen = 0
+            self._clear += 1
+            if self._clear >= self.clear_frames:
+                self._armed = True
+        if self._armed and self._seen >= self.confirm_frames:
+            self._armed = False
+            self.triggers += 1
+            self.on_yellow()
+            return True
+        return False
+
+
+def press_yellow(base_url=GUI_URL, timeout_s=0.5):
+    """Press YELLOW on the control panel: sets /yellow_status and pushes to the drone."""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"{base_url}/yellow", method="POST"),
+                                    timeout=timeout_s):
+            pass
+        print("[DETECT] YELLOW sent to control panel")
+    except (urllib.error.URLError, OSError) as e:
+        print(f"[DETECT] Could not reach control panel: {e}")
+
+
+def file_frames(patterns):
+    """Frames from recorded files: .npy arrays directly, other images through OpenCV."""
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    for path in paths:
+        if path.endswith(".npy"):
+            yield path, np.load(path)
+            continue
+        import cv2
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"[DETECT] Could not read {path}")
+            continue
+        yield path, frame
+
+
+def camera_frames(index=0):
+    import cv2
+    capture = cv2.VideoCapture(index)
+    if not capture.isOpened():
+        raise RuntimeError(f"camera {index} could not be opened")
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                print("[DETECT] Camera stopped delivering frames")
+                return
+            yield f"camera {index}", frame
+    finally:
+        capture.release()
+
+
+def run(frames, detector, trigger=None, report_every=100):
+    count, total_ms, worst_ms = 0, 0.0, 0.0
+    wall = time.perf_counter()
+    for name, frame in frames:
+        detection = detector.detect(frame)
+        count += 1
+        total_ms += detection.elapsed_ms
+        worst_ms = max(worst_ms, detection.elapsed_ms)
+        if trigger is not None:
+            trigger.update(detection)
+        if detection.found:
+            x, y = detection.centroid
+            print(f"[DETECT] {name}: yellow {detection.area_frac * 100:.1f}% at x={x:.2f} y={y:.2f} "
+                  f"({detection.elapsed_ms:.1f} ms)")
+        if report_every and count % report_every == 0:
+            fps = count / (time.perf_counter() - wall)
+            print(f"[DETECT] {count} frames, {fps:.1f} fps, {total_ms / count:.1f} ms mean, {worst_ms:.1f} ms max")
+    if count:
+        print(f"[DETECT] {count} frames, {total_ms / count:.1f} ms mean, {worst_ms:.1f} ms max")
+
+
+def _parse_args(args):
+    options = {"scale": 1, "roi": (0.0, 1.0, 0.0, 1.0), "bgr": True, "dry_run": False}
+    sources = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--scale":
+            options["scale"] = int(args[i + 1])
+            i += 1
+        elif arg == "--roi":
+            options["roi"] = tuple(float(x) for x in args[i + 1].split(","))
+            i += 1
+        elif arg == "--rgb":
+            options["bgr"] = False
+        elif arg == "--dry-run":
+            options["dry_run"] = True
+        else:
+            sources.append(arg)
+        i += 1
+    return sources, options
+
+
+if __name__ == "__main__":
+    sources, options = _parse_args(sys.argv[1:])
+    detector = YellowDetector(options["scale"], options["roi"], bgr=options["bgr"])
+    trigger = None if options["dry_run"] else YellowTrigger(press_yellow)
+
+    if not sources or (len(sources) == 1 and sources[0].isdigit()):
+        frames = camera_frames(int(sources[0]) if sources else 0)
+    else:
+        frames = file_frames(sources)
+    try:
+        run(frames, detector, trigger)
+    except KeyboardInterrupt:
+        print("[DETECT] Stopped")